@@ -1,12 +1,16 @@
 from prefect import flow, get_run_logger, serve
+from prefect.runtime import flow_run
 
-from src.utils.helpers import discover_configs, load_configs
+from src.utils.helpers import discover_configs, load_configs, read_manifest
+from src.utils.snowflake.leases import LeaseManager
 from src.utils.pipeline_tasks import (
     setup_environment,
     prepare_schemas,
     extract_from_minio,
     copy_to_snowflake,
     merge_to_staging,
+    stream_to_snowflake,
+    report_query_stats,
 )
 
 
@@ -21,21 +25,41 @@ def create_pipelines(config_paths: list[str]):
       3. Extract data from MinIO
       4. Copy into RAW layer (stage → infer → pipe → trigger)
       5. Merge into STAGING layer (create → evolve → merge → curated)
+
+    Pipelines with `streaming.enabled` run steps 3-4 as one pipelined stream.
+    With `global.leases.enabled`, pipelines claimed by another worker are skipped.
     """
     logger = get_run_logger()
     configs = load_configs(config_paths)
+    run_id = flow_run.id  # shared by every task so query profiles group by pipeline run
 
     for cfg in configs:
         setup_environment(cfg)
 
-        for pipeline_cfg in cfg.get("pipelines", []):
-            name = pipeline_cfg["namespace"]
-            logger.info(f"Starting pipeline: {name}")
+        leases = LeaseManager(cfg)
+        try:
+            for pipeline_cfg in cfg.get("pipelines", []):
+                name = pipeline_cfg["namespace"]
+
+                with leases.claim_pipeline(pipeline_cfg) as claimed:
+                    if not claimed:
+                        logger.info(f"Skipping pipeline {name}: claimed by another worker.")
+                        continue
+
+                    logger.info(f"Starting pipeline: {name}")
+                    prepare_schemas(cfg, pipeline_cfg)
+                    if pipeline_cfg.get("streaming", {}).get("enabled"):
+                        batch_id = stream_to_snowflake(cfg, pipeline_cfg, run_id)
+                    else:
+                        local_dir = extract_from_minio(cfg, pipeline_cfg)
+                        batch_id = read_manifest(local_dir).get("batch_id")
+                        copy_to_snowflake(cfg, pipeline_cfg, local_dir, run_id)
+                    merge_to_staging(cfg, pipeline_cfg, batch_id, run_id)
 
-            prepare_schemas(cfg, pipeline_cfg)
-            local_dir = extract_from_minio(cfg, pipeline_cfg)
-            copy_to_snowflake(cfg, pipeline_cfg, local_dir)
-            merge_to_staging(cfg, pipeline_cfg)
+                    if cfg["global"].get("query_profiling", {}).get("enabled"):
+                        report_query_stats(cfg, pipeline_cfg)
+        finally:
+            leases.close()
 
     logger.info("All pipelines created successfully.")
 
@@ -0,0 +1,14 @@
+import signal
+import logging
+from src.utils.bucket_listener import BucketListener
+from src.utils.helpers import discover_configs, load_configs
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    config_files = discover_configs()
+
+    listener = BucketListener(load_configs(config_files), config_files)
+    signal.signal(signal.SIGTERM, lambda *_: listener.stop())
+
+    print(f"Listening for MinIO object events with configuration(s): {config_files}")
+    listener.run()  # returns after a final drain on SIGTERM or Ctrl-C
@@ -0,0 +1,27 @@
+import os
+import signal
+import logging
+import threading
+from src.utils.helpers import discover_configs, load_configs
+from src.utils.ingest import EventIngestor, make_server
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    config_files = discover_configs()
+    port = int(os.getenv("INGEST_PORT", "8080"))
+
+    ingestor = EventIngestor(load_configs(config_files))
+    server = make_server(ingestor, port=port)
+
+    # Stop accepting requests on SIGTERM (docker stop) so buffers are flushed below.
+    # shutdown() blocks until serve_forever() returns, so it must run off the serving thread.
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown, daemon=True).start())
+
+    print(f"Serving event ingestion on :{port} for namespaces {ingestor.namespaces}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        ingestor.close()
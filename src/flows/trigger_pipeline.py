@@ -1,18 +1,22 @@
 from prefect import flow, get_run_logger, serve
+from prefect.runtime import flow_run
 from prefect.task_runners import ThreadPoolTaskRunner
 
-from src.utils.helpers import discover_configs, load_configs
+from src.utils.helpers import discover_configs, load_configs, read_manifest
+from src.utils.snowflake.leases import LeaseManager
 from src.utils.pipeline_tasks import (
     extract_from_minio,
     stage_files,
     create_pipe,
     trigger_pipe,
     merge_to_staging,
+    stream_to_snowflake,
+    report_query_stats,
 )
 
 
 @flow(name="trigger_pipeline", task_runner=ThreadPoolTaskRunner(max_workers=3))
-def trigger_pipelines(config_paths: list[str]):
+def trigger_pipelines(config_paths: list[str], namespaces: list[str] | None = None):
     """
     Refresh Snowflake ingestion and rebuild STAGING + CURATED layers.
 
@@ -21,20 +25,44 @@ def trigger_pipelines(config_paths: list[str]):
       2. Restage files into Snowflake
       3. Recreate and trigger Snowpipe ingestion (RAW)
       4. Merge into STAGING layer (includes CURATED subsets if configured)
+
+    Pipelines with `streaming.enabled` run steps 1-3 as one pipelined stream.
+    With `global.leases.enabled`, pipelines claimed by another worker are skipped.
+    `namespaces` limits the run to specific pipelines (used by the bucket listener);
+    such targeted runs wait for a busy pipeline instead, so new objects are never dropped.
     """
     logger = get_run_logger()
     configs = load_configs(config_paths)
+    run_id = flow_run.id  # shared by every task so query profiles group by pipeline run
 
     for cfg in configs:
-        for pipeline_cfg in cfg.get("pipelines", []):
-            name = pipeline_cfg["namespace"]
-            logger.info(f"Triggering pipeline refresh: {name}")
-
-            local_dir = extract_from_minio(cfg, pipeline_cfg)
-            stage_files(cfg, pipeline_cfg, local_dir)
-            create_pipe(cfg, pipeline_cfg)
-            trigger_pipe(cfg, pipeline_cfg)
-            merge_to_staging(cfg, pipeline_cfg)
+        leases = LeaseManager(cfg)
+        try:
+            for pipeline_cfg in cfg.get("pipelines", []):
+                name = pipeline_cfg["namespace"]
+                if namespaces and name.upper() not in {n.upper() for n in namespaces}:
+                    continue
+
+                with leases.claim_pipeline(pipeline_cfg, wait=bool(namespaces)) as claimed:
+                    if not claimed:
+                        logger.info(f"Skipping pipeline {name}: claimed by another worker.")
+                        continue
+
+                    logger.info(f"Triggering pipeline refresh: {name}")
+                    if pipeline_cfg.get("streaming", {}).get("enabled"):
+                        batch_id = stream_to_snowflake(cfg, pipeline_cfg, run_id)
+                    else:
+                        local_dir = extract_from_minio(cfg, pipeline_cfg)
+                        batch_id = read_manifest(local_dir).get("batch_id")
+                        stage_files(cfg, pipeline_cfg, local_dir, run_id)
+                        create_pipe(cfg, pipeline_cfg, batch_id, run_id)
+                        trigger_pipe(cfg, pipeline_cfg, batch_id, run_id)
+                    merge_to_staging(cfg, pipeline_cfg, batch_id, run_id)
+
+                    if cfg["global"].get("query_profiling", {}).get("enabled"):
+                        report_query_stats(cfg, pipeline_cfg)
+        finally:
+            leases.close()
 
     logger.info("All pipelines refreshed, STAGING merged, and CURATED subsets created successfully.")
 
@@ -0,0 +1,185 @@
+import time
+import threading
+from prefect.deployments import run_deployment
+
+from src.utils.minio_client import MinioClient
+
+
+class BucketListener:
+    """
+    Event-driven pipeline triggering from MinIO bucket notifications.
+
+    Object-created events are mapped to the pipeline whose `bucket_path` prefixes
+    the object key, then debounced: a pipeline is dispatched once no new object
+    arrived for `debounce_seconds`, or `max_wait_seconds` after its first pending
+    object. Only the affected pipeline is triggered; the triggered run waits for
+    the pipeline lease if another worker holds it, and batches whose dispatch
+    fails are re-queued. On stop() or Ctrl-C every pending batch is dispatched
+    once more before `run()` returns.
+
+    Configured under `global.notifications`:
+
+        notifications:
+          mode: notify            # notify (bucket notification API) | poll (list + diff)
+          poll_seconds: 10
+          debounce_seconds: 15
+          max_wait_seconds: 120
+          deployment: trigger_pipeline/trigger_pipeline
+    """
+
+    def __init__(self, configs: list[dict], config_paths: list[str], dispatch=None):
+        self.config_paths = config_paths
+        self.dispatch = dispatch or self._run_deployment
+
+        self.routes = []  # (bucket, prefix, namespace, config)
+        for cfg in configs:
+            bucket = cfg["global"]["bucket_name"].lower()
+            for pipeline_cfg in cfg.get("pipelines", []):
+                prefix = pipeline_cfg["bucket_path"].rstrip("/").lower() + "/"
+                self.routes.append((bucket, prefix, pipeline_cfg["namespace"], cfg))
+        # Longest prefix wins when bucket paths are nested
+        self.routes.sort(key=lambda r: len(r[1]), reverse=True)
+
+        notify_cfg = (configs[0]["global"].get("notifications", {}) or {}) if configs else {}
+        self.mode = notify_cfg.get("mode", "notify").lower()
+        self.poll_seconds = float(notify_cfg.get("poll_seconds", 10))
+        self.debounce_seconds = float(notify_cfg.get("debounce_seconds", 15))
+        self.max_wait_seconds = float(notify_cfg.get("max_wait_seconds", 120))
+        self.deployment = notify_cfg.get("deployment", "trigger_pipeline/trigger_pipeline")
+
+        if self.mode not in ("notify", "poll"):
+            raise ValueError(f"Unsupported notifications mode '{self.mode}' (expected 'notify' or 'poll').")
+
+        self._pending = {}  # namespace -> {"objects": set, "first": ts, "last": ts}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def run(self):
+        """Start one event source per bucket and dispatch debounced batches until stopped."""
+        source = self._listen if self.mode == "notify" else self._poll
+        for bucket, cfg in {r[0]: r[3] for r in self.routes}.items():
+            threading.Thread(target=source, args=(cfg,), name=f"{self.mode}-{bucket}", daemon=True).start()
+
+        print(f"[INFO] Listening ({self.mode}) for new objects on {[(r[0], r[1]) for r in self.routes]}")
+        try:
+            while not self._stop.wait(1):
+                self._dispatch_due()
+        except KeyboardInterrupt:
+            print("[INFO] Interrupted; dispatching pending batches before exit")
+        self._stop.set()
+        self._dispatch_due(force=True)
+
+    def stop(self):
+        self._stop.set()
+
+    def _dispatch_due(self, force: bool = False):
+        """Dispatch due batches; failures are re-queued, or only reported on the final forced drain."""
+        for namespace, objects in self._due_batches(force):
+            try:
+                self.dispatch(namespace, objects)
+            except KeyboardInterrupt:
+                self._requeue(namespace, objects)
+                raise
+            except Exception as e:
+                if force:
+                    print(f"[ERROR] Final dispatch failed for {namespace}: {e}; undispatched objects: {objects}")
+                else:
+                    print(f"[ERROR] Dispatch failed for {namespace}: {e}; re-queueing {len(objects)} object(s)")
+                    self._requeue(namespace, objects)
+
+    # ------------------------------------------------------------------
+    # Event sources
+    # ------------------------------------------------------------------
+
+    def _listen(self, cfg: dict):
+        """Consume MinIO bucket notifications, reconnecting with backoff."""
+        minio = MinioClient(cfg)
+        backoff = 1
+        while not self._stop.is_set():
+            try:
+                for key in minio.listen():
+                    self.on_object(minio.bucket, key)
+                    backoff = 1
+                    if self._stop.is_set():
+                        return
+            except Exception as e:
+                print(f"[WARN] Notification stream for '{minio.bucket}' dropped: {e}; reconnecting in {backoff}s")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 60)
+
+    def _poll(self, cfg: dict):
+        """Fallback for stores without notifications: list each bucket path and diff against the last snapshot."""
+        minio = MinioClient(cfg)
+        prefixes = [r[1] for r in self.routes if r[0] == minio.bucket]
+        seen = None
+        while not self._stop.is_set():
+            try:
+                current = {o for p in prefixes for o in minio.list_objects_with_etags(prefix=p)}
+                if seen is not None:
+                    for key, _ in current - seen:
+                        self.on_object(minio.bucket, key)
+                seen = current
+            except Exception as e:
+                print(f"[WARN] Polling '{minio.bucket}' failed: {e}")
+            self._stop.wait(self.poll_seconds)
+
+    # ------------------------------------------------------------------
+    # Routing and debouncing
+    # ------------------------------------------------------------------
+
+    def match(self, bucket: str, key: str) -> str | None:
+        """Return the namespace whose bucket_path prefixes the object key."""
+        key = key.lower()
+        for route_bucket, prefix, namespace, _ in self.routes:
+            if route_bucket == bucket.lower() and key.startswith(prefix):
+                return namespace
+        return None
+
+    def on_object(self, bucket: str, key: str):
+        """Record a newly created object against its pipeline."""
+        namespace = self.match(bucket, key)
+        if namespace is None:
+            return
+        now = time.time()
+        with self._lock:
+            batch = self._pending.setdefault(namespace, {"objects": set(), "first": now, "last": now})
+            batch["objects"].add(key)
+            batch["last"] = now
+
+    def _requeue(self, namespace: str, objects: list[str]):
+        """Put an undispatched batch back so it is retried after the next debounce window."""
+        now = time.time()
+        with self._lock:
+            batch = self._pending.setdefault(namespace, {"objects": set(), "first": now, "last": now})
+            batch["objects"].update(objects)
+            batch["last"] = now
+
+    def _due_batches(self, force: bool = False) -> list[tuple[str, list[str]]]:
+        """Pop batches that have been quiet for `debounce_seconds` or pending for `max_wait_seconds`."""
+        now = time.time()
+        due = []
+        with self._lock:
+            for namespace, batch in list(self._pending.items()):
+                quiet = now - batch["last"] >= self.debounce_seconds
+                overdue = now - batch["first"] >= self.max_wait_seconds
+                if force or quiet or overdue:
+                    due.append((namespace, sorted(batch["objects"])))
+                    del self._pending[namespace]
+        return due
+
+    # ------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------
+
+    def _run_deployment(self, namespace: str, objects: list[str]):
+        """Start the trigger deployment for just this pipeline (fire and forget)."""
+        print(f"[INFO] {len(objects)} new object(s) for {namespace}; triggering {self.deployment}")
+        run_deployment(
+            name=self.deployment,
+            parameters={"config_paths": self.config_paths, "namespaces": [namespace]},
+            timeout=0,
+        )
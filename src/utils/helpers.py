@@ -1,5 +1,7 @@
 import os
 import glob
+import json
+import hashlib
 import yaml
 from pathlib import Path
 from typing import List
@@ -28,6 +30,33 @@ def load_configs(config_paths: List[str]) -> List[dict]:
     return configs
 
 
+# ---------------------------------------------------------------------
+# BATCH MANIFEST HELPERS
+# ---------------------------------------------------------------------
+
+MANIFEST_FILE = ".manifest.json"
+
+
+def compute_batch_id(objects: List[tuple]) -> str:
+    """Derive a stable logical batch id from (object name, etag) pairs."""
+    return hashlib.sha256(json.dumps(sorted(list(o) for o in objects)).encode()).hexdigest()[:32]
+
+
+def write_manifest(local_dir: str, manifest: dict):
+    """Write the batch manifest (batch id + source objects) next to the extracted files."""
+    with open(os.path.join(local_dir, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f)
+
+
+def read_manifest(local_dir: str) -> dict:
+    """Read the batch manifest of an extract directory ({} if missing)."""
+    path = os.path.join(local_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
 # ---------------------------------------------------------------------
 # JINJA RENDERING HELPER
 # ---------------------------------------------------------------------
@@ -0,0 +1,354 @@
+import os
+import csv
+import json
+import time
+import uuid
+import atexit
+import tempfile
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.utils.snowflake.pipeline import SnowflakePipeline
+
+
+# ---------------------------------------------------------------------
+# NAMESPACE BUFFER
+# ---------------------------------------------------------------------
+
+class _NamespaceBuffer:
+    """
+    Bounded record buffer for one pipeline, flushed by a background thread.
+
+    A micro-batch is flushed when it reaches `max_batch_rows` or its oldest
+    record is `max_batch_seconds` old. Producers block once `max_buffered_rows`
+    are waiting (backpressure) and get a TimeoutError after `submit_timeout`.
+
+    On close, a failing flush is retried `close_retries` times; whatever is still
+    unsent is then written as JSON lines to `spill_dir` and `close()` raises.
+    """
+
+    def __init__(self, config: dict, pipeline_cfg: dict):
+        self.config = config
+        self.pipeline_cfg = pipeline_cfg
+        self.namespace = pipeline_cfg["namespace"].upper()
+
+        ingest_cfg = pipeline_cfg.get("ingest", {}) or {}
+        self.max_batch_rows = int(ingest_cfg.get("max_batch_rows", 1000))
+        self.max_batch_seconds = float(ingest_cfg.get("max_batch_seconds", 5))
+        self.max_buffered_rows = int(ingest_cfg.get("max_buffered_rows", 10 * self.max_batch_rows))
+        self.submit_timeout = float(ingest_cfg.get("submit_timeout", 30))
+        self.merge_after_flush = bool(ingest_cfg.get("merge_after_flush", False))
+        self.close_retries = int(ingest_cfg.get("close_retries", 3))
+        self.spill_dir = ingest_cfg.get("spill_dir", "ingest_spill")
+
+        self._records = deque()
+        self._oldest = None
+        self._cond = threading.Condition()
+        self._closing = False
+        self._inflight = False
+        self._raw_ready = False
+        self._failures = 0
+        self._last_error = None
+        self._spill_path = None
+        self._tmp_dir = tempfile.mkdtemp(prefix=f"ingest_{self.namespace.lower()}_")
+
+        self._thread = threading.Thread(target=self._run, name=f"ingest-{self.namespace}", daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def submit(self, records: list[dict]):
+        """Append records, blocking while the buffer is full."""
+        deadline = time.time() + self.submit_timeout
+        with self._cond:
+            if self._closing:
+                raise RuntimeError(f"Ingestion for '{self.namespace}' is shutting down.")
+            while len(self._records) + len(records) > self.max_buffered_rows and self._records:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise TimeoutError(f"Buffer for '{self.namespace}' is full ({len(self._records)} rows).")
+                self._cond.wait(remaining)
+
+            self._records.extend(records)
+            if self._oldest is None:
+                self._oldest = time.time()
+            self._cond.notify_all()
+
+    def flush(self):
+        """
+        Block until everything buffered so far has been flushed.
+
+        Raises RuntimeError as soon as a flush attempt fails (records stay
+        buffered and are retried) or the flusher thread has stopped.
+        """
+        with self._cond:
+            if self._records:
+                self._oldest = 0  # force the flusher to treat the batch as due
+                self._cond.notify_all()
+            failures = self._failures
+            while self._records or self._inflight:
+                if self._failures != failures:
+                    raise RuntimeError(f"Flush for '{self.namespace}' failed: {self._last_error}")
+                if not self._thread.is_alive():
+                    break
+                self._cond.wait(1)
+            if not self._thread.is_alive() and (self._records or self._spill_path):
+                raise RuntimeError(f"Flusher for '{self.namespace}' has stopped; buffered records were not loaded.")
+
+    def close(self):
+        """Flush all remaining records and stop the flusher thread; raise if records had to be spilled."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join()
+        if self._spill_path:
+            raise RuntimeError(
+                f"Could not flush '{self.namespace}' at shutdown ({self._last_error}); "
+                f"unsent records were written to {self._spill_path}"
+            )
+
+    # ------------------------------------------------------------------
+    # Flusher side
+    # ------------------------------------------------------------------
+
+    def _due(self) -> bool:
+        if not self._records:
+            return False
+        if self._closing or len(self._records) >= self.max_batch_rows:
+            return True
+        return time.time() - self._oldest >= self.max_batch_seconds
+
+    def _run(self):
+        sf = None
+        close_attempts = 0
+        try:
+            while True:
+                with self._cond:
+                    while not self._due():
+                        if self._closing and not self._records:
+                            return
+                        timeout = None if self._oldest is None else self.max_batch_seconds - (time.time() - self._oldest)
+                        self._cond.wait(max(min(timeout, 1), 0.05) if timeout is not None else 1)
+
+                    batch = [self._records.popleft() for _ in range(min(self.max_batch_rows, len(self._records)))]
+                    self._oldest = time.time() if self._records else None
+                    self._inflight = True
+                    self._cond.notify_all()  # wake producers blocked on a full buffer
+
+                try:
+                    sf = sf or SnowflakePipeline(self.config, self.pipeline_cfg)
+                    self._load(sf, batch)
+                except Exception as e:
+                    print(f"[ERROR] Flush failed for {self.namespace} ({len(batch)} rows): {e}")
+                    with self._cond:
+                        self._records.extendleft(reversed(batch))  # retry on the next cycle
+                        if self._oldest is None:
+                            self._oldest = time.time()
+                        self._failures += 1
+                        self._last_error = e
+                    if self._closing:
+                        close_attempts += 1
+                        if close_attempts > self.close_retries:
+                            self._spill()
+                            return
+                    time.sleep(self.max_batch_seconds)
+                finally:
+                    with self._cond:
+                        self._inflight = False
+                        self._cond.notify_all()
+        finally:
+            if sf:
+                sf.close()
+
+    def _load(self, sf: SnowflakePipeline, batch: list[dict]):
+        """
+        Write a micro-batch file, PUT it into the pipeline's ingest stage, and COPY it into RAW.
+
+        The ingest stage is separate from the stage Snowpipe reads, so a later
+        REFRESH never loads these files a second time.
+        """
+        stage = sf.env.ingest_stage
+        file_path = self._write_csv(batch)
+        try:
+            if not self._raw_ready:
+                sf.env.ensure_stage(stage)
+            staged = sf.env.stage_file(file_path, stage)
+
+            if not self._raw_ready:
+                sf.build_raw(stage)
+                self._raw_ready = True
+
+            sf.pipe.copy_files([staged], stage)
+            if self.merge_after_flush:
+                sf.build_staging()
+        finally:
+            os.remove(file_path)
+
+        print(f"[INFO] Flushed {len(batch)} record(s) for {self.namespace} → {staged}")
+
+    def _spill(self):
+        """Write every unsent record to a local JSON-lines file so nothing is lost on shutdown."""
+        with self._cond:
+            records = list(self._records)
+            self._records.clear()
+            self._cond.notify_all()
+
+        os.makedirs(self.spill_dir, exist_ok=True)
+        file_name = f"{self.namespace.lower()}_{time.strftime('%Y%m%dT%H%M%S')}_{uuid.uuid4().hex[:8]}.jsonl"
+        path = os.path.join(self.spill_dir, file_name)
+        with open(path, "w") as f:
+            for record in records:
+                f.write(json.dumps(record, default=str) + "\n")
+        self._spill_path = path
+        print(f"[ERROR] Spilled {len(records)} unsent record(s) for {self.namespace} to {path}")
+
+    def _write_csv(self, batch: list[dict]) -> str:
+        """Serialize records to CSV; nested values are written as JSON (VARIANT-friendly)."""
+        columns = []
+        for record in batch:
+            columns.extend(k for k in record if k not in columns)
+
+        file_name = f"{self.namespace.lower()}_{time.strftime('%Y%m%dT%H%M%S')}_{uuid.uuid4().hex[:8]}.csv"
+        file_path = os.path.join(self._tmp_dir, file_name)
+        with open(file_path, "w", newline="") as f:
+            writer = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC, escapechar="\\", doublequote=False)
+            writer.writerow(columns)
+            for record in batch:
+                writer.writerow([_csv_value(record.get(c)) for c in columns])
+        return file_path
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+# ---------------------------------------------------------------------
+# INGESTOR
+# ---------------------------------------------------------------------
+
+class EventIngestor:
+    """
+    In-process micro-batching ingestion API for low-latency producers.
+
+    Records submitted per namespace are buffered and flushed as size- or
+    time-bounded CSV micro-batches straight into the pipeline's internal stage,
+    followed by a COPY into RAW. Buffers are flushed on `close()`, on context
+    exit, and at interpreter shutdown.
+
+        with EventIngestor(load_configs(paths)) as ingestor:
+            ingestor.submit("USER_EVENTS", [{"id": 1, "event_type": "login", ...}])
+    """
+
+    def __init__(self, configs: list[dict]):
+        self._buffers = {
+            pipeline_cfg["namespace"].upper(): _NamespaceBuffer(cfg, pipeline_cfg)
+            for cfg in configs
+            for pipeline_cfg in cfg.get("pipelines", [])
+        }
+        self._closed = False
+        atexit.register(self.close)
+
+    @property
+    def namespaces(self) -> list[str]:
+        return sorted(self._buffers)
+
+    def submit(self, namespace: str, records: dict | list[dict]) -> int:
+        """Buffer one or more records for a namespace; returns the number accepted."""
+        buffer = self._buffers.get(namespace.upper())
+        if buffer is None:
+            raise KeyError(f"Unknown namespace '{namespace}'. Known: {self.namespaces}")
+        records = [records] if isinstance(records, dict) else records
+        if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+            raise TypeError("Records must be a JSON object or an array of objects.")
+        if records:
+            buffer.submit(records)
+        return len(records)
+
+    def flush(self, namespace: str | None = None):
+        """Synchronously flush one namespace (or all)."""
+        targets = [self._buffers[namespace.upper()]] if namespace else self._buffers.values()
+        for buffer in targets:
+            buffer.flush()
+
+    def close(self):
+        """Flush everything and stop all flusher threads (idempotent); raise if any buffer had to spill."""
+        if self._closed:
+            return
+        self._closed = True
+        errors = []
+        for buffer in self._buffers.values():
+            try:
+                buffer.close()
+            except RuntimeError as e:
+                errors.append(e)
+        if errors:
+            raise errors[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ---------------------------------------------------------------------
+# HTTP FRONT END
+# ---------------------------------------------------------------------
+
+def make_server(ingestor: EventIngestor, host: str = "0.0.0.0", port: int = 8080) -> ThreadingHTTPServer:
+    """
+    Minimal HTTP front end:
+
+      POST /events/<NAMESPACE>   body: JSON object or array → 202 {"accepted": n}
+      POST /flush[/<NAMESPACE>]  → 200 once buffered records are loaded
+      GET  /health               → 200 {"namespaces": [...]}
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status: int, payload: dict):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path.rstrip("/") == "/health":
+                return self._reply(200, {"namespaces": ingestor.namespaces})
+            self._reply(404, {"error": "not found"})
+
+        def do_POST(self):
+            parts = [p for p in self.path.split("?")[0].split("/") if p]
+            try:
+                if parts[:1] == ["flush"]:
+                    ingestor.flush(parts[1] if len(parts) > 1 else None)
+                    return self._reply(200, {"flushed": True})
+
+                if parts[:1] != ["events"] or len(parts) != 2:
+                    return self._reply(404, {"error": "not found"})
+
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"[]")
+                accepted = ingestor.submit(parts[1], payload)
+                self._reply(202, {"accepted": accepted})
+            except json.JSONDecodeError as e:
+                self._reply(400, {"error": f"invalid JSON: {e}"})
+            except (TypeError, ValueError) as e:
+                self._reply(400, {"error": str(e)})
+            except KeyError as e:
+                self._reply(404, {"error": str(e)})
+            except (TimeoutError, RuntimeError) as e:
+                self._reply(503, {"error": str(e)})
+
+        def log_message(self, fmt, *args):
+            print(f"[DEBUG] ingest {self.address_string()} {fmt % args}")
+
+    return ThreadingHTTPServer((host, port), Handler)
@@ -1,4 +1,5 @@
 import os
+from urllib.parse import unquote
 from minio import Minio
 
 
@@ -69,3 +70,22 @@ class MinioClient:
         if self.logger:
             self.logger.info(f"Found {len(objects)} object(s) under '{prefix}'")
         return objects
+
+    def list_objects_with_etags(self, prefix: str | None = None) -> list[tuple[str, str]]:
+        """List (object name, etag) pairs under a prefix (recursive)."""
+        prefix = prefix.lower() if prefix else self.path
+        return [
+            (obj.object_name, obj.etag)
+            for obj in self.client.list_objects(self.bucket, prefix=prefix, recursive=True)
+        ]
+
+    # ------------------------------------------------------------------
+    # Notifications
+    # ------------------------------------------------------------------
+
+    def listen(self, prefix: str = "", events: tuple[str, ...] = ("s3:ObjectCreated:*",)):
+        """Yield object names from MinIO bucket notifications (blocks until the stream closes)."""
+        with self.client.listen_bucket_notification(self.bucket, prefix=prefix, events=events) as stream:
+            for event in stream:
+                for record in event.get("Records", []):
+                    yield unquote(record["s3"]["object"]["key"])
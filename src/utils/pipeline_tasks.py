@@ -1,8 +1,10 @@
 import os
 import tempfile
 from prefect import task, get_run_logger
+from src.utils.helpers import compute_batch_id, read_manifest, write_manifest
 from src.utils.minio_client import MinioClient
 from src.utils.snowflake.pipeline import SnowflakePipeline
+from src.utils.streaming import StreamingIngest
 
 
 # ---------------------------------------------------------------------
@@ -35,9 +37,21 @@ def extract_from_minio(cfg: dict, pipeline_cfg: dict) -> str:
     tmp_dir = tempfile.mkdtemp(prefix=f"minio_{pipeline_cfg['namespace'].lower()}_")
 
     minio.ensure_bucket()
-    objects = minio.list_objects(prefix=prefix)
-    logger.info(f"Downloading {len(objects)} object(s) from '{prefix}'...")
-
+    listing = minio.list_objects_with_etags(prefix=prefix)
+    objects = sorted(name for name, _ in listing)
+    batch_id = compute_batch_id(listing)
+    write_manifest(tmp_dir, {"batch_id": batch_id, "objects": objects})
+
+    if cfg["global"].get("checkpoints", {}).get("enabled"):
+        sf = SnowflakePipeline(cfg, pipeline_cfg, batch_id)
+        try:
+            if sf.is_staged(objects):
+                logger.info(f"Batch {batch_id} already staged; skipping download of {len(objects)} object(s).")
+                return tmp_dir
+        finally:
+            sf.close()
+
+    logger.info(f"Downloading {len(objects)} object(s) from '{prefix}' (batch {batch_id})...")
     for obj in objects:
         local_path = os.path.join(tmp_dir, os.path.basename(obj))
         minio.download(obj, local_path)
@@ -51,10 +65,10 @@ def extract_from_minio(cfg: dict, pipeline_cfg: dict) -> str:
 # ---------------------------------------------------------------------
 
 @task
-def stage_files(cfg: dict, pipeline_cfg: dict, local_dir: str):
+def stage_files(cfg: dict, pipeline_cfg: dict, local_dir: str, run_id: str | None = None):
     """Upload local CSVs into Snowflake stage."""
     logger = get_run_logger()
-    sf = SnowflakePipeline(cfg, pipeline_cfg)
+    sf = SnowflakePipeline(cfg, pipeline_cfg, read_manifest(local_dir).get("batch_id"), run_id)
     try:
         sf.stage_files(local_dir)
         logger.info(f"Files staged for {sf.raw.raw_db}.{sf.stage.schema}.{sf.stage.table}.")
@@ -63,10 +77,10 @@ def stage_files(cfg: dict, pipeline_cfg: dict, local_dir: str):
 
 
 @task
-def create_raw_table(cfg: dict, pipeline_cfg: dict):
+def create_raw_table(cfg: dict, pipeline_cfg: dict, batch_id: str | None = None, run_id: str | None = None):
     """Create or evolve RAW layer table via schema inference."""
     logger = get_run_logger()
-    sf = SnowflakePipeline(cfg, pipeline_cfg)
+    sf = SnowflakePipeline(cfg, pipeline_cfg, batch_id, run_id)
     try:
         sf.build_raw()
         logger.info(f"RAW table ensured: {sf.raw.raw_db}.{sf.stage.schema}.{sf.stage.table}.")
@@ -75,10 +89,10 @@ def create_raw_table(cfg: dict, pipeline_cfg: dict):
 
 
 @task
-def create_staging_table(cfg: dict, pipeline_cfg: dict):
+def create_staging_table(cfg: dict, pipeline_cfg: dict, batch_id: str | None = None, run_id: str | None = None):
     """Create or alter the STAGING table and perform merge."""
     logger = get_run_logger()
-    sf = SnowflakePipeline(cfg, pipeline_cfg)
+    sf = SnowflakePipeline(cfg, pipeline_cfg, batch_id, run_id)
     try:
         sf.build_staging()
         logger.info(f"STAGING table ensured for {sf.stage.schema}.{sf.stage.table}.")
@@ -87,10 +101,10 @@ def create_staging_table(cfg: dict, pipeline_cfg: dict):
 
 
 @task
-def create_pipe(cfg: dict, pipeline_cfg: dict):
+def create_pipe(cfg: dict, pipeline_cfg: dict, batch_id: str | None = None, run_id: str | None = None):
     """Create or replace the Snowpipe definition."""
     logger = get_run_logger()
-    sf = SnowflakePipeline(cfg, pipeline_cfg)
+    sf = SnowflakePipeline(cfg, pipeline_cfg, batch_id, run_id)
     try:
         sf.create_pipe()
         logger.info(f"Snowpipe ensured for {sf.raw.raw_db}.{sf.stage.schema}.{sf.stage.table}.")
@@ -98,10 +112,10 @@ def create_pipe(cfg: dict, pipeline_cfg: dict):
         sf.close()
 
 @task
-def trigger_pipe(cfg: dict, pipeline_cfg: dict):
+def trigger_pipe(cfg: dict, pipeline_cfg: dict, batch_id: str | None = None, run_id: str | None = None):
     """Trigger Snowpipe ingestion for the given dataset."""
     logger = get_run_logger()
-    sf = SnowflakePipeline(cfg, pipeline_cfg)
+    sf = SnowflakePipeline(cfg, pipeline_cfg, batch_id, run_id)
     try:
         sf.trigger_pipe()
         logger.info(
@@ -116,10 +130,10 @@ def trigger_pipe(cfg: dict, pipeline_cfg: dict):
 # ---------------------------------------------------------------------
 
 @task
-def copy_to_snowflake(cfg: dict, pipeline_cfg: dict, local_dir: str):
+def copy_to_snowflake(cfg: dict, pipeline_cfg: dict, local_dir: str, run_id: str | None = None):
     """Full RAW ingestion sequence: stage → create RAW table → create pipe → trigger."""
     logger = get_run_logger()
-    sf = SnowflakePipeline(cfg, pipeline_cfg)
+    sf = SnowflakePipeline(cfg, pipeline_cfg, read_manifest(local_dir).get("batch_id"), run_id)
     try:
         sf.stage_files(local_dir)
         sf.build_raw()
@@ -134,22 +148,52 @@ def copy_to_snowflake(cfg: dict, pipeline_cfg: dict, local_dir: str):
 
 
 @task
-def merge_to_staging(cfg: dict, pipeline_cfg: dict):
+def stream_to_snowflake(cfg: dict, pipeline_cfg: dict, run_id: str | None = None) -> str:
+    """Pipelined RAW ingestion: download → stage → micro-batched load, connected by bounded queues. Returns the batch id."""
+    logger = get_run_logger()
+    ingest = StreamingIngest(cfg, pipeline_cfg, run_id)
+    loaded = ingest.run()
+    logger.info(f"Streamed {len(loaded)} file(s) into RAW for '{pipeline_cfg['namespace']}' (batch {ingest.batch_id}).")
+    return ingest.batch_id
+
+
+@task
+def merge_to_staging(cfg: dict, pipeline_cfg: dict, batch_id: str | None = None, run_id: str | None = None):
     """Execute STAGING layer creation + merge (deduped incremental)."""
     logger = get_run_logger()
-    sf = SnowflakePipeline(cfg, pipeline_cfg)
+    sf = SnowflakePipeline(cfg, pipeline_cfg, batch_id, run_id)
     try:
         sf.build_staging()
         logger.info(
             f"STAGING merge completed for {sf.stage.schema}.{sf.stage.table}."
         )
 
+        if sf.profile_staging() is not None:
+            logger.info(f"Data quality profile recorded for {sf.stage.schema}.{sf.stage.table}.")
+
         sf.build_curated()
         logger.info(f"CURATED subsets created for {sf.stage.schema}.{sf.stage.table}.")
     finally:
         sf.close()
 
 
+@task
+def report_query_stats(cfg: dict, pipeline_cfg: dict) -> list[dict]:
+    """Report per-step query regressions (scan ratio, runtime, spilling) against the baseline."""
+    logger = get_run_logger()
+    sf = SnowflakePipeline(cfg, pipeline_cfg)
+    try:
+        report = sf.report_query_stats()
+        flagged = [r["step"] for r in report if r["flags"]]
+        if flagged:
+            logger.warning(f"Query regressions for '{pipeline_cfg['namespace']}' in steps: {flagged}")
+        else:
+            logger.info(f"No query regressions for '{pipeline_cfg['namespace']}' ({len(report)} step(s) compared).")
+        return report
+    finally:
+        sf.close()
+
+
 @task
 def prepare_schemas(cfg: dict, pipeline_cfg: dict):
     """Ensure schemas exist across all configured databases (RAW, STAGING, CURATED)."""
@@ -1,19 +1,110 @@
 import os
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
 import snowflake.connector
 from src.utils.helpers import render_template
+from src.utils.snowflake.routing import WarehouseRouter
 
 
 class SnowflakeClient:
     """Lightweight Snowflake connector and SQL executor."""
 
-    def __init__(self):
-        """Initialize Snowflake connection from environment variables."""
+    # Open operations per warehouse across all clients in this process (e.g. streaming worker threads),
+    # so `suspend_after` only fires once the last of them exits
+    _active = Counter()
+    _active_lock = threading.Lock()
+
+    def __init__(self, config: dict | None = None, tag_prefix: str | None = None):
+        """
+        Initialize Snowflake connection from environment variables.
+
+        Args:
+            config: Optional full config; `global.warehouses` drives per-operation routing
+            tag_prefix: Optional `pipeline/namespace` prefix for the session QUERY_TAG
+        """
+        self.router = WarehouseRouter(config)
+        self.tag_prefix = tag_prefix
         self.conn = snowflake.connector.connect(
             account=os.getenv("SNOWFLAKE_ACCOUNT"),
             user=os.getenv("SNOWFLAKE_USER"),
             password=os.getenv("SNOWFLAKE_PASSWORD"),
-            warehouse=os.getenv("SNOWFLAKE_WAREHOUSE"),
+            warehouse=self.router.default["name"],
         )
+        self._warehouse = self.router.default["name"]
+        self._query_tag = None
+        self._hinted = set()
+        self._operations = []
+        self.last_query_id = None
+        self._last_sql = None
+        self.query_log = []  # (op_class, step, query_id, statement) for every statement run inside an operation
+
+    # ------------------------------------------------------------------
+    # Warehouse routing and query tagging
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def operation(self, op_class: str, step: str):
+        """
+        Run the enclosed statements on the warehouse routed for `op_class`,
+        tagged as `<tag_prefix>/<step>`. Nested operations fall back to the outer one on exit.
+
+        A `suspend_after` warehouse is suspended only when the outermost operation
+        using it exits, across every client in the process.
+        """
+        route = self.router.resolve(op_class)
+        name = route["name"]
+        self._apply_hints(route)
+        with self._active_lock:
+            self._active[name] += 1
+        self._operations.append((op_class, route, step))
+        try:
+            yield
+        finally:
+            self._operations.pop()
+            with self._active_lock:
+                self._active[name] -= 1
+                last = self._active[name] <= 0
+                if last:
+                    del self._active[name]
+            if last and route.get("suspend_after") and name:
+                self._run(f"ALTER WAREHOUSE IF EXISTS {name} SUSPEND;", raise_errors=False)
+                self._hinted.discard(name)
+
+    def _apply_hints(self, route: dict):
+        """Apply sizing hints the first time a warehouse is routed to on this connection (best effort, like SUSPEND)."""
+        name = route["name"]
+        if not name or name in self._hinted:
+            return
+        hints = []
+        if route.get("size"):
+            hints.append(f"WAREHOUSE_SIZE = '{route['size']}'")
+        if route.get("auto_suspend") is not None:
+            hints.append(f"AUTO_SUSPEND = {int(route['auto_suspend'])}")
+        if hints:
+            self._run(f"ALTER WAREHOUSE IF EXISTS {name} SET {' '.join(hints)};", raise_errors=False)
+        self._hinted.add(name)
+
+    def _sync_session(self):
+        """
+        Switch warehouse and QUERY_TAG to the innermost operation (or back to the
+        default warehouse and bare tag prefix outside any operation), only when they change.
+        """
+        if self._operations:
+            _, route, step = self._operations[-1]
+        else:
+            route, step = self.router.default, None
+
+        name = route["name"]
+        if name and name != self._warehouse:
+            self._run(f"USE WAREHOUSE {name};")
+            self._warehouse = name
+
+        tag = "/".join(filter(None, [self.tag_prefix, step])) or None
+        if tag != self._query_tag:
+            self._run(f"ALTER SESSION SET QUERY_TAG = '{tag}';" if tag else "ALTER SESSION UNSET QUERY_TAG;")
+            self._query_tag = tag
 
     # ------------------------------------------------------------------
     # Core execution
@@ -21,11 +112,26 @@ class SnowflakeClient:
 
     def execute(self, sql: str):
         """Execute a SQL command and return results if available."""
+        self._sync_session()
+        result = self._run(sql)
+        if self._operations and self.last_query_id:
+            op_class, _, step = self._operations[-1]
+            self.query_log.append((op_class, step, self.last_query_id, self._last_sql))
+        return result
+
+    def _run(self, sql: str, raise_errors: bool = True):
+        """Execute a statement as-is on the current session."""
         sql = " ".join(sql.strip().split())
         cur = self.conn.cursor()
         try:
             cur.execute(sql)
+            self.last_query_id, self._last_sql = cur.sfqid, sql
             return cur.fetchall() if cur.description else None
+        except Exception as e:
+            if raise_errors:
+                raise
+            print(f"[WARN] Ignored failure for statement '{sql[:80]}': {e}")
+            return None
         finally:
             cur.close()
 
@@ -42,11 +148,13 @@ class SnowflakeClient:
 
     def create_database(self, name: str):
         """Create a database if it does not exist."""
-        self.execute(f"CREATE DATABASE IF NOT EXISTS {name};")
+        with self.operation("ddl", "env.create_database"):
+            self.execute(f"CREATE DATABASE IF NOT EXISTS {name};")
 
     def create_schema(self, db: str, schema: str):
         """Create a schema if it does not exist."""
-        self.execute(f"CREATE SCHEMA IF NOT EXISTS {db}.{schema};")
+        with self.operation("ddl", "env.create_schema"):
+            self.execute(f"CREATE SCHEMA IF NOT EXISTS {db}.{schema};")
 
     def create_file_format(self, db: str, schema: str, name: str):
         """Create a file format using a Jinja SQL template."""
@@ -54,7 +162,8 @@ class SnowflakeClient:
             "create_file_format.sql",
             {"database": db, "schema": schema, "name": name},
         )
-        self.execute(sql)
+        with self.operation("ddl", "env.create_file_format"):
+            self.execute(sql)
 
     def create_stage(self, db: str, schema: str, stage: str, file_format_ref: str):
         """Create a stage using a Jinja SQL template."""
@@ -67,4 +176,5 @@ class SnowflakeClient:
                 "file_format_ref": file_format_ref,
             },
         )
-        self.execute(sql)
+        with self.operation("ddl", "env.create_stage"):
+            self.execute(sql)
@@ -0,0 +1,144 @@
+import re
+from dataclasses import dataclass, field
+
+
+# "<expression> AS <alias>" — the alias is the trailing identifier after the last standalone AS
+_ALIAS_RE = re.compile(r"^(?P<expr>.+?)\s+AS\s+(?P<alias>[A-Za-z_][A-Za-z0-9_$]*)\s*$", re.IGNORECASE | re.DOTALL)
+# "<root>[:path][::TYPE]" — root is a column (or VALUE / INDEX of an exploded array)
+_PATH_RE = re.compile(
+    r"^(?P<root>[A-Za-z_][A-Za-z0-9_$]*)(?P<path>(?::[^:]+|\[[^\]]+\])*)(?:::(?P<cast>[A-Za-z_][A-Za-z0-9_(), ]*))?$"
+)
+_ELEMENT_ROOTS = ("VALUE", "INDEX", "KEY", "SEQ", "PATH", "THIS")
+# Double-quoted path keys, which may legitimately contain whitespace
+_QUOTED_RE = re.compile(r'("[^"]*")')
+
+
+def _strip_unquoted_whitespace(expr: str) -> str:
+    """Remove whitespace outside double-quoted path keys (`:"user name"` is kept intact)."""
+    return "".join(part if part.startswith('"') else "".join(part.split()) for part in _QUOTED_RE.split(expr))
+
+
+@dataclass(frozen=True)
+class FlattenField:
+    """One projected field, e.g. `EVENT_METADATA:user_id::NUMBER AS USER_ID`."""
+
+    root: str
+    path: str
+    cast: str | None
+    alias: str
+
+    @property
+    def expression(self) -> str:
+        return f"{self.root}{self.path}{f'::{self.cast}' if self.cast else ''}"
+
+    def projection(self, qualifier: str | None = None) -> str:
+        root = f"{qualifier}.{self.root}" if qualifier else self.root
+        return f"{root}{self.path}{f'::{self.cast}' if self.cast else ''} AS {self.alias}"
+
+
+@dataclass
+class FlattenPlan:
+    """Compiled projections and LATERAL joins for a pipeline's `flatten_columns`."""
+
+    projections: list[str] = field(default_factory=list)
+    aliases: list[str] = field(default_factory=list)
+    laterals: list[str] = field(default_factory=list)
+
+
+def parse_field(spec: str) -> FlattenField:
+    """
+    Parse a flatten field spec into its parts.
+
+    Accepts `ROOT[:path...][::TYPE] [AS ALIAS]`. Without an explicit alias the
+    last path segment is used (`EVENT_METADATA:user_id::NUMBER` → `USER_ID`).
+    """
+    text = spec.strip()
+    match = _ALIAS_RE.match(text)
+    expr, alias = (match.group("expr"), match.group("alias")) if match else (text, None)
+
+    parsed = _PATH_RE.match(_strip_unquoted_whitespace(expr))
+    if not parsed:
+        raise ValueError(f"Unsupported flatten field expression: '{spec}'")
+
+    path = parsed.group("path") or ""
+    if alias is None:
+        segments = re.findall(r"[A-Za-z_][A-Za-z0-9_$]*", path)
+        if not segments:
+            raise ValueError(f"Flatten field '{spec}' needs an explicit alias (AS <name>).")
+        alias = segments[-1]
+
+    return FlattenField(
+        root=parsed.group("root").upper(),
+        path=path,
+        cast=(parsed.group("cast") or "").upper() or None,
+        alias=alias.upper(),
+    )
+
+
+def plan_flatten(flatten_columns: list[dict], primary_keys: list[str] | None = None) -> FlattenPlan:
+    """
+    Plan projections for `flatten_columns`.
+
+    Scalar fields become direct path projections on the source row, so no
+    LATERAL FLATTEN (and no row multiplication) is needed. A LATERAL FLATTEN is
+    only emitted for entries marked `explode: true`, whose fields are written
+    relative to the array element (`VALUE:sku::STRING AS SKU`):
+
+        - column: EVENT_METADATA
+          explode: true
+          path: items         # optional, array location inside the column
+          outer: true         # optional, keep rows whose array is empty
+          fields:
+            - "INDEX AS ITEM_INDEX"
+            - "VALUE:sku::STRING AS ITEM_SKU"
+
+    STAGING keeps one row per primary key, so when `primary_keys` is given and
+    arrays are exploded, at least one exploded alias (typically the INDEX
+    alias) must be part of it; otherwise the exploded rows would collapse back
+    to one per source row.
+    """
+    plan = FlattenPlan()
+    exploded = []
+    flat_aliases = []
+
+    for entry in flatten_columns or []:
+        column = entry["column"].upper()
+        fields = [parse_field(f) for f in entry.get("fields", [])]
+
+        if entry.get("explode"):
+            # One alias per exploded entry: several arrays of the same column get _2, _3, ...
+            base_alias = flat_alias = f"{column.lower()}_flat"
+            while flat_alias in flat_aliases:
+                flat_alias = f"{base_alias}_{len(flat_aliases) + 1}"
+            flat_aliases.append(flat_alias)
+            path = entry.get("path")
+            source = f"{column}:{path}" if path else column
+            outer = ", OUTER => TRUE" if entry.get("outer") else ""
+            plan.laterals.append(f"LATERAL FLATTEN(input => {source}{outer}) AS {flat_alias}")
+
+            for f in fields:
+                if f.root not in _ELEMENT_ROOTS:
+                    raise ValueError(
+                        f"Exploded field '{f.alias}' must reference the array element (VALUE, INDEX, ...), not '{f.root}'."
+                    )
+                plan.projections.append(f.projection(flat_alias))
+                plan.aliases.append(f.alias)
+                exploded.append(f.alias)
+        else:
+            for f in fields:
+                if f.root != column:
+                    raise ValueError(f"Field '{f.alias}' reads from '{f.root}' but is listed under column '{column}'.")
+                plan.projections.append(f.projection())
+                plan.aliases.append(f.alias)
+
+    duplicates = sorted({a for a in plan.aliases if plan.aliases.count(a) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate flatten field aliases: {duplicates}")
+
+    if primary_keys is not None and exploded and not {k.upper() for k in primary_keys} & set(exploded):
+        raise ValueError(
+            f"Exploded fields {exploded} need one of their aliases (e.g. the INDEX alias) in primary_keys "
+            f"{list(primary_keys)}; otherwise deduplication collapses them to one row per key."
+        )
+
+    return plan
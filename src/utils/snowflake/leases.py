@@ -0,0 +1,218 @@
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from src.utils.helpers import render_template
+from src.utils.snowflake.client import SnowflakeClient
+
+
+class LeaseManager:
+    """
+    Cross-worker leases backed by a UTILS table.
+
+    A lease is a row `(RESOURCE, OWNER, EXPIRES_AT)`; it is acquired with a single
+    MERGE that only succeeds when the row is missing, expired, or already ours,
+    and kept alive by a heartbeat thread until released. Crashed workers simply
+    stop heartbeating, so their leases expire after `ttl_seconds`.
+
+    RESOURCE carries no uniqueness constraint, so two workers acquiring a fresh
+    lease at the same time can both insert a row. Ownership is therefore only
+    granted when no other live row exists for the resource, and a worker that
+    finds such a duplicate deletes its own row and retries later.
+
+    Configured under `global.leases`:
+
+        leases:
+          enabled: true
+          table: PIPELINE_LEASES
+          ttl_seconds: 300
+          heartbeat_seconds: 60
+          wait_seconds: 600     # how long table-level steps wait for a busy lease
+          poll_seconds: 10
+
+    When disabled every `hold()` succeeds immediately without touching Snowflake.
+    """
+
+    def __init__(self, config: dict):
+        global_cfg = config["global"]
+        lease_cfg = global_cfg.get("leases", {}) or {}
+
+        self.config = config
+        self.enabled = bool(lease_cfg.get("enabled", False))
+        self.database = global_cfg["utils_database"]
+        self.schema = global_cfg["utils_schema"]
+        self.table = lease_cfg.get("table", "PIPELINE_LEASES")
+        self.ttl = int(lease_cfg.get("ttl_seconds", 300))
+        self.heartbeat = int(lease_cfg.get("heartbeat_seconds", max(self.ttl // 5, 1)))
+        self.wait_seconds = int(lease_cfg.get("wait_seconds", 600))
+        self.poll_seconds = int(lease_cfg.get("poll_seconds", 10))
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self._client = None
+        self._lock = threading.Lock()
+        self._ensured = False
+        self._lost = {}  # resource -> Event set by the heartbeat when the lease is lost
+
+    @property
+    def table_ref(self) -> str:
+        return f"{self.database}.{self.schema}.{self.table}"
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def hold(self, resource: str, wait: int | None = None, required: bool = True):
+        """
+        Hold a lease on `resource` for the duration of the block.
+
+        Args:
+            resource: Logical resource name (e.g. 'STAGING.USER_ACTIVITY.USER_EVENTS')
+            wait: Seconds to wait for a busy lease (defaults to `wait_seconds`; 0 = try once)
+            required: Raise TimeoutError when not acquired; otherwise yield False
+
+        Raises RuntimeError when the block finishes after the lease was lost (taken
+        over by another worker, or not renewed within `ttl_seconds`), so the step
+        fails instead of silently reporting success.
+        """
+        if not self.enabled:
+            yield True
+            return
+
+        wait = self.wait_seconds if wait is None else wait
+        acquired = self._acquire_with_wait(resource, wait)
+        if not acquired:
+            if required:
+                raise TimeoutError(f"Could not acquire lease on '{resource}' within {wait}s (owner {self.owner}).")
+            yield False
+            return
+
+        stop, lost = threading.Event(), threading.Event()
+        self._lost[resource] = lost
+        beat = threading.Thread(target=self._heartbeat, args=(resource, stop, lost), daemon=True)
+        beat.start()
+        try:
+            yield True
+        finally:
+            stop.set()
+            beat.join()
+            self.release(resource)
+            self._lost.pop(resource, None)
+
+        if lost.is_set():
+            raise RuntimeError(f"Lease on '{resource}' was lost while the step was running (owner {self.owner}).")
+
+    def check(self, resource: str):
+        """Raise RuntimeError if a lease held via `hold()` has been lost; no-op otherwise."""
+        lost = self._lost.get(resource)
+        if lost is not None and lost.is_set():
+            raise RuntimeError(f"Lease on '{resource}' was lost while the step was running (owner {self.owner}).")
+
+    def claim_pipeline(self, pipeline_cfg: dict, wait: bool = False):
+        """
+        Claim a whole pipeline, so concurrent workers each pick up pipelines
+        nobody else holds. By default the claim is non-blocking and yields False
+        when another worker has it; with `wait` it waits up to `wait_seconds` for
+        the current holder and raises TimeoutError if the pipeline stays busy.
+        """
+        resource = f"PIPELINE:{pipeline_cfg['schema']}.{pipeline_cfg['namespace']}"
+        if wait:
+            return self.hold(resource)
+        return self.hold(resource, wait=0, required=False)
+
+    def try_acquire(self, resource: str) -> bool:
+        """Attempt to take or renew the lease once; return True if we now own it exclusively."""
+        self._ensure_table()
+        sql = render_template(
+            "acquire_lease.sql",
+            {
+                "database": self.database,
+                "schema": self.schema,
+                "table": self.table,
+                "resource": resource,
+                "owner": self.owner,
+                "ttl": self.ttl,
+            },
+        )
+        with self._lock, self.client.operation("ddl", "lease.acquire"):
+            self.client.execute(sql)
+            rows = self.client.execute(
+                f"SELECT COUNT_IF(OWNER = '{self.owner}'), "
+                f"COUNT_IF(OWNER <> '{self.owner}' AND EXPIRES_AT > CURRENT_TIMESTAMP()) "
+                f"FROM {self.table_ref} WHERE RESOURCE = '{resource}';"
+            )
+            mine, others = rows[0] if rows else (0, 0)
+            if mine and others:
+                # Concurrent first-time MERGEs both inserted: step aside so the duplicate disappears
+                self.client.execute(
+                    f"DELETE FROM {self.table_ref} WHERE RESOURCE = '{resource}' AND OWNER = '{self.owner}';"
+                )
+                print(f"[WARN] Found a duplicate lease row on {resource}; removed ours and will retry.")
+        return bool(mine) and not others
+
+    def release(self, resource: str):
+        """Release a lease we own."""
+        with self._lock, self.client.operation("ddl", "lease.release"):
+            self.client.execute(
+                f"DELETE FROM {self.table_ref} WHERE RESOURCE = '{resource}' AND OWNER = '{self.owner}';"
+            )
+        print(f"[INFO] Released lease on {resource}")
+
+    def close(self):
+        """Close the lease connection, if one was opened."""
+        if self._client:
+            self._client.close()
+            self._client = None
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    @property
+    def client(self) -> SnowflakeClient:
+        """Dedicated connection so heartbeats never queue behind long-running steps."""
+        if self._client is None:
+            self._client = SnowflakeClient(self.config, "leases")
+        return self._client
+
+    def _ensure_table(self):
+        if self._ensured:
+            return
+        sql = render_template(
+            "create_lease_table.sql",
+            {"database": self.database, "schema": self.schema, "table": self.table},
+        )
+        with self._lock, self.client.operation("ddl", "lease.setup"):
+            self.client.execute(sql)
+        self._ensured = True
+
+    def _acquire_with_wait(self, resource: str, wait: int) -> bool:
+        deadline = time.time() + wait
+        while True:
+            if self.try_acquire(resource):
+                print(f"[INFO] Acquired lease on {resource} ({self.owner})")
+                return True
+            if time.time() >= deadline:
+                return False
+            print(f"[INFO] Lease on {resource} is held by another worker; retrying in {self.poll_seconds}s...")
+            time.sleep(min(self.poll_seconds, max(deadline - time.time(), 0)))
+
+    def _heartbeat(self, resource: str, stop: threading.Event, lost: threading.Event):
+        """Extend the lease periodically until `stop` is set; set `lost` if it cannot be kept."""
+        renewed_at = time.time()
+        while not stop.wait(self.heartbeat):
+            try:
+                if not self.try_acquire(resource):
+                    print(f"[WARN] Lost lease on {resource}; another worker has taken it over.")
+                    lost.set()
+                    return
+                renewed_at = time.time()
+            except Exception as e:
+                print(f"[WARN] Lease heartbeat failed for {resource}: {e}")
+                if time.time() - renewed_at >= self.ttl:
+                    print(f"[WARN] Lease on {resource} expired without renewal.")
+                    lost.set()
+                    return
@@ -2,7 +2,11 @@ import os
 import glob
 import time
 import json
+import hashlib
+import uuid
 from src.utils.helpers import render_template
+from src.utils.snowflake.flatten import plan_flatten
+from src.utils.snowflake.routing import routed
 
 
 # =============================================================================
@@ -29,9 +33,12 @@ class _BaseOps:
         self.schema = self.pipeline_cfg.get("schema")
         self.table = self.pipeline_cfg.get("namespace")
         self.stage = self.table
+        # Separate stage for API micro-batches: no pipe reads it, so REFRESH never reloads them
+        self.ingest_stage = f"{self.table}_INGEST" if self.table else None
         self.path = self.pipeline_cfg.get("bucket_path", "").rstrip("/").lower()
         self.max_files = self.pipeline_cfg.get("max_file_count", 5)
 
+    @routed("ddl", "metadata.columns")
     def _get_columns(self, database, schema, table):
         """Retrieve column metadata from INFORMATION_SCHEMA."""
         sql = f"""
@@ -63,6 +70,7 @@ class _BaseOps:
 # =============================================================================
 
 class _EnvOps(_BaseOps):
+    @routed("ddl", "env.setup")
     def setup_environment(self):
         """Create databases, schemas, and file formats if missing."""
         g = self.config["global"]
@@ -74,18 +82,28 @@ class _EnvOps(_BaseOps):
         for db in g.get("databases", {}).values():
             self.client.create_database(db)
 
-    def stage_files(self, local_dir: str):
-        """Upload local files to a Snowflake internal stage."""
+    @routed("ddl", "env.stage")
+    def ensure_stage(self, stage: str | None = None):
+        """Create or alter the internal stage for the pipeline (or another of its stages)."""
         file_format_ref = f"{self.utils_db}.{self.utils_schema}.{self.file_format}"
-        self.client.create_stage(self.raw_db, self.schema, self.stage, file_format_ref)
+        self.client.create_stage(self.raw_db, self.schema, stage or self.stage, file_format_ref)
 
-        stage_path = f"@{self.raw_db}.{self.schema}.{self.stage}/{self.path}/"
+    def stage_files(self, local_dir: str):
+        """Upload local files to a Snowflake internal stage."""
+        self.ensure_stage()
         for file_path in glob.glob(os.path.join(local_dir, "*.csv")):
-            file_name = os.path.basename(file_path)
-            self.client.execute(
-                f"PUT file://{file_path} {stage_path}{file_name} "
-                f"AUTO_COMPRESS=FALSE OVERWRITE=TRUE;"
-            )
+            self.stage_file(file_path)
+
+    @routed("load", "env.put")
+    def stage_file(self, file_path: str, stage: str | None = None) -> str:
+        """PUT a single local file under the bucket path of a stage (default: the pipe's) and return its stage-relative path."""
+        file_name = os.path.basename(file_path)
+        stage_path = f"@{self.raw_db}.{self.schema}.{stage or self.stage}/{self.path}/"
+        self.client.execute(
+            f"PUT file://{file_path} {stage_path}{file_name} "
+            f"AUTO_COMPRESS=FALSE OVERWRITE=TRUE;"
+        )
+        return f"{self.path}/{file_name}"
 
 
 # =============================================================================
@@ -93,8 +111,9 @@ class _EnvOps(_BaseOps):
 # =============================================================================
 
 class _RawOps(_BaseOps):
-    def create_inferred_table(self):
-        """Infer schema from staged files and create or evolve RAW table."""
+    @routed("infer", "raw.infer")
+    def create_inferred_table(self, stage: str | None = None):
+        """Infer schema from staged files (in `stage`, default the pipe's stage) and create or evolve RAW table."""
         file_format_ref = f"{self.utils_db}.{self.utils_schema}.{self.file_format}"
 
         sql = self._render(
@@ -103,7 +122,7 @@ class _RawOps(_BaseOps):
                 "database": self.raw_db,
                 "schema": self.schema,
                 "table": self.table,
-                "stage": self.stage,
+                "stage": stage or self.stage,
                 "file_format_ref": file_format_ref,
                 "path": self.path,
                 "max_files": self.max_files,
@@ -125,12 +144,20 @@ class _RawOps(_BaseOps):
 # =============================================================================
 
 class _StagingOps(_BaseOps):
+    # merge_strategy → template; all of them share the deduplicated source in _dedup_source.sql
+    MERGE_TEMPLATES = {
+        "merge": "merge_into.sql",
+        "insert_only": "insert_only.sql",
+        "delete_insert": "delete_insert.sql",
+    }
+
+    @routed("ddl", "staging.create")
     def create(self):
         """Create STAGING table based on RAW structure with JSON flatten support."""
         raw_cols = self._get_columns(self.raw_db, self.schema, self.table)
         staging_cfg = self.pipeline_cfg.get("staging", {})
         exclude = staging_cfg.get("exclude_columns", [])
-        flatten_columns = staging_cfg.get("flatten_columns", [])
+        plan = plan_flatten(staging_cfg.get("flatten_columns", []), staging_cfg.get("primary_keys", []))
 
         sql = self._render(
             "create_staging_table.sql",
@@ -141,13 +168,15 @@ class _StagingOps(_BaseOps):
                 "table": self.table,
                 "all_columns": [c for c in raw_cols.keys() if c not in exclude],
                 "exclude_columns": exclude,
-                "flatten_columns": flatten_columns,
+                "flatten_projections": plan.projections,
+                "flatten_laterals": plan.laterals,
             },
         )
 
         print("[DEBUG] Rendered CREATE STAGING SQL:\n", sql)
         self.client.execute(sql)
 
+    @routed("ddl", "staging.evolve")
     def evolve(self):
         """Evolve STAGING schema by adding newly discovered columns."""
         raw_cols = self._get_columns(self.raw_db, self.schema, self.table)
@@ -177,24 +206,39 @@ class _StagingOps(_BaseOps):
         print(f"[INFO] Evolving STAGING.{self.schema}.{self.table} with columns: {[c['name'] for c in new_columns]}")
         self.client.execute(sql)
 
+    @routed("merge", "staging.merge")
     def merge(self):
-        """Merge deduplicated data from RAW → STAGING, flattening JSON if configured."""
+        """
+        Load deduplicated data from RAW → STAGING, flattening JSON if configured.
+
+        `staging.merge_strategy` selects how rows are applied:
+          - merge (default): upsert on the primary keys
+          - insert_only: append rows whose key is not yet in STAGING (anti-join)
+          - delete_insert: replace whole `partition_columns` partitions that received RAW
+            rows newer than STAGING's `watermark_column` (`partition_columns` is required)
+        """
         cfg = self.pipeline_cfg.get("staging", {})
+        strategy = cfg.get("merge_strategy", "merge").lower()
+        if strategy not in self.MERGE_TEMPLATES:
+            raise ValueError(
+                f"Unsupported merge_strategy '{strategy}' for {self.schema}.{self.table} "
+                f"(expected one of {list(self.MERGE_TEMPLATES)})."
+            )
+        partition_cols = cfg.get("partition_columns") or []
+        if strategy == "delete_insert" and not partition_cols:
+            raise ValueError(f"merge_strategy 'delete_insert' requires partition_columns for {self.schema}.{self.table}.")
+
         exclude = cfg.get("exclude_columns", [])
+        watermark = cfg.get("watermark_column", "__INGESTED_TIMESTAMP")
+        if strategy == "delete_insert" and watermark in exclude:
+            raise ValueError(f"watermark_column '{watermark}' must be kept in STAGING for merge_strategy 'delete_insert'.")
         pk = cfg.get("primary_keys", [])
         sk = cfg.get("sort_key", ["__INGESTED_TIMESTAMP"])
-        flatten_columns = cfg.get("flatten_columns", [])
+        plan = plan_flatten(cfg.get("flatten_columns", []), pk)
         raw_cols = self._get_columns(self.raw_db, self.schema, self.table)
 
-        flatten_fields = []
-        for fc in flatten_columns:
-            for field in fc.get("fields", []):
-                alias = field.split("AS")[-1].strip() if "AS" in field else None
-                if alias:
-                    flatten_fields.append(alias)
-
         sql = self._render(
-            "merge_into.sql",
+            self.MERGE_TEMPLATES[strategy],
             {
                 "raw_db": self.raw_db,
                 "staging_db": self.staging_db,
@@ -204,12 +248,15 @@ class _StagingOps(_BaseOps):
                 "exclude_columns": exclude,
                 "primary_keys": pk,
                 "sort_keys": sk,
-                "flatten_columns": flatten_columns,
-                "flatten_fields": flatten_fields,
+                "flatten_projections": plan.projections,
+                "flatten_laterals": plan.laterals,
+                "flatten_fields": plan.aliases,
+                "partition_columns": partition_cols,
+                "watermark_column": watermark,
             },
         )
 
-        print(f"[DEBUG] Rendered MERGE SQL for {self.schema}.{self.table}:\n", sql)
+        print(f"[DEBUG] Rendered {strategy} SQL for {self.schema}.{self.table}:\n", sql)
         self.client.execute(sql)
 
 
@@ -218,8 +265,8 @@ class _StagingOps(_BaseOps):
 # =============================================================================
 
 class _PipeOps(_BaseOps):
-    def build_copy_query(self):
-        """Construct COPY INTO statement with metadata columns."""
+    def build_copy_query(self, files: list[str] | None = None, stage: str | None = None):
+        """Construct COPY INTO statement with metadata columns, optionally limited to files of a given stage."""
         file_format_ref = f"{self.utils_db}.{self.utils_schema}.{self.file_format}"
         sys_cols = self.config["global"].get("system_columns", [])
         include_meta = (
@@ -233,12 +280,16 @@ class _PipeOps(_BaseOps):
                 "database": self.raw_db,
                 "schema": self.schema,
                 "table": self.table,
-                "stage": self.stage,
+                "stage": stage or self.stage,
+                # Explicit files are stage-relative; otherwise read only the bucket path
+                "path": None if files else self.path,
                 "file_format_ref": file_format_ref,
                 "include_metadata": include_meta,
+                "files": files or [],
             },
         )
 
+    @routed("ddl", "pipe.create")
     def create(self):
         """Create or replace Snowpipe definition."""
         copy_sql = self.build_copy_query().rstrip(";")
@@ -255,15 +306,33 @@ class _PipeOps(_BaseOps):
 
     def trigger(self, delay: int = 3, max_wait: int = 120, settle_wait: int = 60):
         """Trigger Snowpipe ingestion, wait for completion, and allow metadata to settle."""
+        self.refresh()
+        self.wait(delay, max_wait, settle_wait)
+
+    @routed("load", "pipe.refresh")
+    def refresh(self):
+        """Queue staged files for Snowpipe ingestion without waiting."""
         pipe_name = f"{self.raw_db}.{self.schema}.{self.table}"
         self.client.execute(f"ALTER PIPE {pipe_name} REFRESH;")
         print(f"[INFO] Triggered Snowpipe refresh for {pipe_name}")
 
+    @routed("load", "pipe.copy")
+    def copy_files(self, files: list[str], stage: str | None = None):
+        """Synchronously COPY an explicit list of staged files (default: from the pipe's stage) into the RAW table."""
+        if not files:
+            return
+        self.client.execute(self.build_copy_query(files, stage))
+        print(f"[INFO] Copied {len(files)} file(s) into {self.raw_db}.{self.schema}.{self.table}")
+
+    def wait(self, delay: int = 3, max_wait: int = 120, settle_wait: int = 60):
+        """Wait for Snowpipe to drain, then allow ingestion metadata to settle."""
+        pipe_name = f"{self.raw_db}.{self.schema}.{self.table}"
         self._wait_for_pipe(pipe_name, delay, max_wait)
         print(f"[INFO] Waiting {settle_wait}s for ingestion metadata to settle...")
         time.sleep(settle_wait)
         print(f"[INFO] Proceeding after metadata settle delay.")
 
+    @routed("monitor", "pipe.status")
     def _wait_for_pipe(self, pipe_name: str, delay: int = 3, max_wait: int = 30):
         """Poll SYSTEM$PIPE_STATUS until Snowpipe completes."""
         start_time = time.time()
@@ -293,6 +362,7 @@ class _PipeOps(_BaseOps):
 class _CuratedOps(_BaseOps):
     """Generate curated subset tables or secure views from STAGING layer."""
 
+    @routed("curated", "curated.subsets")
     def create_subsets(self):
         """Create filtered subsets or secure views in CURATED layer."""
         subsets = self.pipeline_cfg.get("subsets", [])
@@ -318,3 +388,395 @@ class _CuratedOps(_BaseOps):
             print(f"[INFO] Creating subset {object_type}: {self.curated_db}.{self.schema}.{name}")
             print(f"[DEBUG] SQL:\n{sql}")
             self.client.execute(sql)
+
+
+# =============================================================================
+# DATA QUALITY
+# =============================================================================
+
+_WATERMARK_FORMAT = "YYYY-MM-DD HH24:MI:SS.FF9 TZHTZM"
+
+
+class _QualityOps(_BaseOps):
+    """
+    Single-scan data quality profiler for STAGING tables.
+
+    All configured checks compile into one GROUPING SETS aggregate, so the table
+    (or only the rows changed since the last profile) is scanned once. Results
+    are appended to a UTILS history table and evaluated against thresholds.
+    """
+
+    def __init__(self, client, config, pipeline_cfg):
+        super().__init__(client, config, pipeline_cfg)
+        quality_cfg = self.pipeline_cfg.get("quality", {}) or {}
+        self.enabled = bool(quality_cfg.get("enabled", False))
+        self.scope = quality_cfg.get("scope", "full").lower()
+        self.on_failure = quality_cfg.get("on_failure", "warn").lower()
+        self.history_table = quality_cfg.get("history_table", "DQ_PROFILE_HISTORY")
+        self.watermark_column = quality_cfg.get("watermark_column", "__INGESTED_TIMESTAMP")
+        self.file_column = quality_cfg.get("file_column", "__FILE_NAME")
+        self.checks = quality_cfg.get("checks", {}) or {}
+
+        if self.scope not in ("full", "changed"):
+            raise ValueError(f"Unsupported quality scope '{self.scope}' (expected 'full' or 'changed').")
+
+    @property
+    def history_ref(self) -> str:
+        return f"{self.utils_db}.{self.utils_schema}.{self.history_table}"
+
+    @routed("ddl", "quality.history")
+    def ensure_history(self):
+        """Create the profile history table if missing."""
+        self.client.execute(
+            self._render(
+                "create_profile_history.sql",
+                {"database": self.utils_db, "schema": self.utils_schema, "table": self.history_table},
+            )
+        )
+
+    @routed("monitor", "quality.watermark")
+    def last_watermark(self) -> str | None:
+        """Return the watermark recorded by the previous profile of this table."""
+        rows = self.client.execute(f"""
+            SELECT TO_VARCHAR(MAX(WATERMARK), '{_WATERMARK_FORMAT}')
+            FROM {self.history_ref}
+            WHERE TARGET_DATABASE = '{self.staging_db}'
+              AND TARGET_SCHEMA = '{self.schema}'
+              AND TARGET_TABLE = '{self.table}';
+        """)
+        return rows[0][0] if rows and rows[0][0] else None
+
+    def build_profile_query(self, since: str | None = None) -> str:
+        """Compile all configured checks into one aggregate query."""
+        cfg = self.pipeline_cfg.get("staging", {})
+        primary_keys = cfg.get("primary_keys", []) if self.checks.get("primary_key_unique", True) else []
+
+        return self._render(
+            "profile_table.sql",
+            {
+                "database": self.staging_db,
+                "schema": self.schema,
+                "table": self.table,
+                "primary_keys": primary_keys,
+                "null_columns": list((self.checks.get("null_rate") or {}).keys()),
+                "file_column": self.file_column,
+                "watermark_column": self.watermark_column,
+                "since": since,
+                "timestamp_format": _WATERMARK_FORMAT,
+            },
+        )
+
+    def evaluate(self, metrics: dict, since: str | None = None) -> list[str]:
+        """
+        Compare profile metrics against configured thresholds; return violations.
+
+        A `changed` profile with no new rows since the last watermark is not a
+        violation: the row-count checks only apply when rows were actually profiled.
+        """
+        violations = []
+        row_count = int(metrics.get("row_count") or 0)
+        nothing_changed = self.scope == "changed" and since is not None and row_count == 0
+
+        if self.checks.get("primary_key_unique", True):
+            if metrics.get("duplicate_keys"):
+                violations.append(f"duplicate_keys={metrics['duplicate_keys']} (expected 0)")
+            if metrics.get("null_keys"):
+                violations.append(f"null_keys={metrics['null_keys']} (expected 0)")
+
+        null_rates = metrics.get("null_rates") or {}
+        for col, max_rate in (self.checks.get("null_rate") or {}).items():
+            rate = null_rates.get(col)
+            if rate is not None and float(rate) > float(max_rate):
+                violations.append(f"null_rate[{col}]={float(rate):.4f} > {max_rate}")
+
+        min_rows = self.checks.get("min_row_count")
+        if min_rows is not None and not nothing_changed and row_count < int(min_rows):
+            violations.append(f"row_count={row_count} < {min_rows}")
+
+        min_file_rows = self.checks.get("min_rows_per_file")
+        file_rows = metrics.get("min_rows_per_file")
+        if min_file_rows is not None and file_rows is not None and int(file_rows) < int(min_file_rows):
+            violations.append(f"min_rows_per_file={file_rows} < {min_file_rows}")
+
+        return violations
+
+    @routed("monitor", "quality.profile")
+    def profile(self) -> dict:
+        """Profile the STAGING table in one scan, record history, and enforce thresholds."""
+        self.ensure_history()
+        since = self.last_watermark() if self.scope == "changed" else None
+
+        sql = self.build_profile_query(since)
+        print(f"[DEBUG] Rendered PROFILE SQL for {self.schema}.{self.table}:\n", sql)
+        rows = self.client.execute(sql)
+        metrics = json.loads(rows[0][0]) if rows and rows[0][0] else {}
+
+        violations = self.evaluate(metrics, since)
+        passed = not violations
+        watermark = metrics.get("watermark") or since
+
+        self.client.execute(f"""
+            INSERT INTO {self.history_ref}
+                (TARGET_DATABASE, TARGET_SCHEMA, TARGET_TABLE, SCOPE, METRICS, VIOLATIONS, PASSED, WATERMARK)
+            SELECT
+                '{self.staging_db}', '{self.schema}', '{self.table}', '{self.scope}',
+                PARSE_JSON($${json.dumps(metrics)}$$),
+                PARSE_JSON($${json.dumps(violations)}$$),
+                {str(passed).upper()},
+                {f"TO_TIMESTAMP_LTZ('{watermark}', '{_WATERMARK_FORMAT}')" if watermark else "NULL"};
+        """)
+
+        if passed:
+            print(f"[INFO] Data quality passed for {self.staging_db}.{self.schema}.{self.table} ({self.scope})")
+        else:
+            message = f"Data quality violations for {self.staging_db}.{self.schema}.{self.table}: {violations}"
+            if self.on_failure == "fail":
+                raise RuntimeError(message)
+            print(f"[WARN] {message}")
+
+        return {"metrics": metrics, "violations": violations, "passed": passed}
+
+
+# =============================================================================
+# RUN STATE / CHECKPOINTS
+# =============================================================================
+
+class _CheckpointOps(_BaseOps):
+    """
+    Step-level run-state store for resumable pipeline runs.
+
+    Each completed step of a logical batch is recorded with its inputs in a
+    UTILS table. A step is skipped on rerun only if it was recorded with the
+    same inputs *after* every earlier step of the batch, so a run resumes at
+    the first incomplete step and re-executes everything after it.
+
+    Step inputs always include a hash of the config sections the step reads
+    (STEP_CONFIG), so a config change reruns that step even for an unchanged batch.
+    """
+
+    STEP_ORDER = ("stage", "raw", "pipe", "trigger", "staging", "curated")
+    # Pipeline config keys each step depends on (falling back to `global` for shared keys)
+    STEP_CONFIG = {
+        "stage": ("bucket_path",),
+        "raw": ("bucket_path", "max_file_count", "column_overrides", "system_columns"),
+        "pipe": ("bucket_path", "system_columns"),
+        "trigger": ("bucket_path",),
+        "staging": ("staging",),
+        "curated": ("subsets",),
+    }
+
+    def __init__(self, client, config, pipeline_cfg):
+        super().__init__(client, config, pipeline_cfg)
+        checkpoint_cfg = config["global"].get("checkpoints", {}) or {}
+        self.enabled = bool(checkpoint_cfg.get("enabled", False))
+        self.state_table = checkpoint_cfg.get("table", "PIPELINE_RUN_STATE")
+        self._ensured = False
+
+    @property
+    def state_ref(self) -> str:
+        return f"{self.utils_db}.{self.utils_schema}.{self.state_table}"
+
+    @routed("ddl", "checkpoint.setup")
+    def ensure_table(self):
+        """Create the run-state table if missing."""
+        if self._ensured:
+            return
+        self.client.execute(
+            self._render(
+                "create_run_state_table.sql",
+                {"database": self.utils_db, "schema": self.utils_schema, "table": self.state_table},
+            )
+        )
+        self._ensured = True
+
+    @routed("monitor", "checkpoint.read")
+    def completed(self, batch_id: str) -> dict:
+        """Return {step: (inputs, completed_at)} for the latest record of each step in a batch."""
+        self.ensure_table()
+        rows = self.client.execute(f"""
+            SELECT STEP, TO_JSON(INPUTS), COMPLETED_AT
+            FROM {self.state_ref}
+            WHERE BATCH_ID = '{batch_id}'
+              AND TARGET_SCHEMA = '{self.schema}'
+              AND NAMESPACE = '{self.table}'
+            QUALIFY ROW_NUMBER() OVER (PARTITION BY STEP ORDER BY COMPLETED_AT DESC) = 1;
+        """)
+        return {r[0]: (json.loads(r[1]) if r[1] else {}, r[2]) for r in rows or []}
+
+    def config_hash(self, step: str) -> str:
+        """Hash the config sections `step` depends on."""
+        global_cfg = self.config["global"]
+        section = {k: self.pipeline_cfg.get(k, global_cfg.get(k)) for k in self.STEP_CONFIG.get(step, ())}
+        return hashlib.sha256(json.dumps(section, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+    def _step_inputs(self, step: str, inputs: dict | None) -> dict:
+        return {**(inputs or {}), "config": self.config_hash(step)}
+
+    def is_complete(self, batch_id: str, step: str, inputs: dict) -> bool:
+        """True if `step` was recorded with `inputs` (and the current config) after all preceding steps of the batch."""
+        state = self.completed(batch_id)
+        if step not in state:
+            return False
+
+        recorded_inputs, completed_at = state[step]
+        if recorded_inputs != json.loads(json.dumps(self._step_inputs(step, inputs))):
+            return False
+
+        earlier = self.STEP_ORDER[: self.STEP_ORDER.index(step)] if step in self.STEP_ORDER else ()
+        return all(state[p][1] <= completed_at for p in earlier if p in state)
+
+    @routed("monitor", "checkpoint.record")
+    def record(self, batch_id: str, step: str, inputs: dict):
+        """Record a completed step with its inputs and config hash."""
+        self.ensure_table()
+        inputs = self._step_inputs(step, inputs)
+        self.client.execute(f"""
+            INSERT INTO {self.state_ref} (BATCH_ID, TARGET_SCHEMA, NAMESPACE, STEP, INPUTS)
+            SELECT '{batch_id}', '{self.schema}', '{self.table}', '{step}', PARSE_JSON($${json.dumps(inputs)}$$);
+        """)
+
+    def run(self, batch_id: str | None, step: str, fn, inputs: dict | None = None):
+        """Execute `fn` unless the step is already complete for this batch, then checkpoint it."""
+        inputs = inputs or {}
+        if not self.enabled or not batch_id:
+            return fn()
+
+        if self.is_complete(batch_id, step, inputs):
+            print(f"[INFO] Skipping step '{step}' for {self.schema}.{self.table}: already completed in batch {batch_id}")
+            return None
+
+        result = fn()
+        self.record(batch_id, step, inputs)
+        return result
+
+    @routed("monitor", "checkpoint.schema_hash")
+    def schema_hash(self, database: str) -> str:
+        """Hash the current column layout of this pipeline's table in `database`."""
+        cols = self._get_columns(database, self.schema, self.table)
+        return hashlib.sha256(json.dumps(sorted(cols.items())).encode()).hexdigest()[:16]
+
+
+# =============================================================================
+# QUERY OPERATOR STATS
+# =============================================================================
+
+class _QueryStatsOps(_BaseOps):
+    """
+    Collect operator-level and query-history metrics for the SQL a pipeline runs.
+
+    Query IDs captured by SnowflakeClient are expanded with GET_QUERY_OPERATOR_STATS
+    (pruning, spilling, join output rows) and QUERY_HISTORY_BY_SESSION (compile /
+    execution time), stored per pipeline and step, and compared to a baseline.
+
+    Only the data-moving operation classes are profiled, and all statements of
+    one flow run share its `run_id`, so baselines compare whole pipeline runs.
+    """
+
+    # Operation classes whose statements are profiled (status polls, metadata and checkpoint reads are not)
+    PROFILED_CLASSES = ("load", "merge", "curated")
+    # Statements that produce an operator plan worth profiling
+    _PROFILED_PREFIXES = ("SELECT", "WITH", "MERGE", "INSERT", "UPDATE", "DELETE", "COPY")
+    # Snowflake Scripting blocks; their child statements are profiled instead
+    _SCRIPT_PREFIXES = ("BEGIN", "DECLARE")
+
+    def __init__(self, client, config, pipeline_cfg, run_id: str | None = None):
+        super().__init__(client, config, pipeline_cfg)
+        stats_cfg = config["global"].get("query_profiling", {}) or {}
+        self.enabled = bool(stats_cfg.get("enabled", False))
+        self.stats_table = stats_cfg.get("table", "QUERY_PROFILE_HISTORY")
+        self.baseline_runs = int(stats_cfg.get("baseline_runs", 5))
+        self.scan_ratio_tolerance = float(stats_cfg.get("scan_ratio_tolerance", 0.1))
+        self.runtime_tolerance = float(stats_cfg.get("runtime_tolerance", 0.5))
+        self.batch_size = int(stats_cfg.get("batch_size", 50))
+        self.run_id = run_id or uuid.uuid4().hex
+
+    @classmethod
+    def is_profiled(cls, sql: str, op_class: str | None = None) -> bool:
+        """True for DML / queries (including CREATE ... AS SELECT and scripting blocks) of a profiled class."""
+        if op_class is not None and op_class not in cls.PROFILED_CLASSES:
+            return False
+        text = sql.lstrip().upper()
+        if text.startswith(cls._PROFILED_PREFIXES) or cls.is_script(text):
+            return True
+        return text.startswith("CREATE") and (" AS SELECT" in text or " AS WITH" in text)
+
+    @classmethod
+    def is_script(cls, sql: str) -> bool:
+        return sql.lstrip().upper().startswith(cls._SCRIPT_PREFIXES)
+
+    def _context(self) -> dict:
+        return {
+            "database": self.utils_db,
+            "schema": self.utils_schema,
+            "table": self.stats_table,
+            "target_schema": self.schema,
+            "namespace": self.table,
+        }
+
+    @routed("ddl", "profiling.setup")
+    def ensure_table(self):
+        """Create the query profile history table if missing."""
+        self.client.execute(self._render("create_query_stats_table.sql", self._context()))
+
+    def _script_children(self, query_id: str) -> list[str]:
+        """Query IDs of the DML / queries a scripting block ran (same session, within its runtime)."""
+        rows = self.client.execute(f"""
+            WITH history AS (
+                SELECT QUERY_ID, QUERY_TYPE, START_TIME, END_TIME
+                FROM TABLE({self.utils_db}.INFORMATION_SCHEMA.QUERY_HISTORY_BY_SESSION(RESULT_LIMIT => 10000))
+            )
+            SELECT child.QUERY_ID
+            FROM history AS child
+            JOIN history AS block ON block.QUERY_ID = '{query_id}'
+            WHERE child.QUERY_ID <> block.QUERY_ID
+              AND child.START_TIME >= block.START_TIME
+              AND child.END_TIME <= block.END_TIME
+              AND child.QUERY_TYPE IN ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'MERGE', 'COPY', 'CREATE_TABLE_AS_SELECT')
+            ORDER BY child.START_TIME;
+        """)
+        return [r[0] for r in rows or []]
+
+    @routed("monitor", "profiling.collect")
+    def collect(self, query_log: list[tuple[str, str, str, str]]):
+        """Store operator stats + query history for every profiled statement in `query_log`."""
+        queries = []
+        for op_class, step, query_id, sql in query_log:
+            if not query_id or not self.is_profiled(sql, op_class):
+                continue
+            children = self._script_children(query_id) if self.is_script(sql) else [query_id]
+            queries.extend({"step": step, "query_id": child} for child in children)
+        if not queries:
+            return
+
+        self.ensure_table()
+        for i in range(0, len(queries), self.batch_size):
+            sql = self._render(
+                "collect_query_stats.sql",
+                {**self._context(), "run_id": self.run_id, "queries": queries[i:i + self.batch_size]},
+            )
+            self.client.execute(sql)
+        print(f"[INFO] Collected operator stats for {len(queries)} statement(s) of {self.schema}.{self.table}")
+
+    @routed("monitor", "profiling.report")
+    def report(self) -> list[dict]:
+        """Compare each step's latest run to its baseline; return rows with regression flags."""
+        self.ensure_table()
+        rows = self.client.execute(
+            self._render("query_stats_report.sql", {**self._context(), "baseline_runs": self.baseline_runs})
+        ) or []
+
+        report = []
+        for step, ratio, base_ratio, elapsed, base_elapsed, spilled, base_spilled, runs in rows:
+            flags = []
+            if ratio is not None and base_ratio is not None and float(ratio) > float(base_ratio) + self.scan_ratio_tolerance:
+                flags.append(f"scan ratio {float(ratio):.2f} vs baseline {float(base_ratio):.2f}")
+            if elapsed is not None and base_elapsed and float(elapsed) > float(base_elapsed) * (1 + self.runtime_tolerance):
+                flags.append(f"runtime {int(elapsed)}ms vs baseline {int(base_elapsed)}ms")
+            if spilled and not base_spilled:
+                flags.append(f"spilled {int(spilled)} bytes (baseline none)")
+
+            report.append({"step": step, "baseline_runs": runs, "flags": flags})
+            if flags:
+                print(f"[WARN] Query regression in {self.schema}.{self.table} step '{step}': {'; '.join(flags)}")
+
+        return report
@@ -1,18 +1,41 @@
+from src.utils.helpers import read_manifest
 from src.utils.snowflake.client import SnowflakeClient
-from src.utils.snowflake.operations import _EnvOps, _RawOps, _StagingOps, _PipeOps, _CuratedOps
+from src.utils.snowflake.leases import LeaseManager
+from src.utils.snowflake.operations import _EnvOps, _RawOps, _StagingOps, _PipeOps, _CuratedOps, _QualityOps, _CheckpointOps, _QueryStatsOps
 
 
 class SnowflakePipeline:
     """High-level Snowflake ETL orchestrator composed of modular operation classes."""
 
-    def __init__(self, config, pipeline_cfg=None):
-        self.client = SnowflakeClient()
+    def __init__(self, config, pipeline_cfg=None, batch_id: str | None = None, run_id: str | None = None):
+        pipeline_cfg = pipeline_cfg or {}
+        tag_prefix = "/".join(filter(None, [pipeline_cfg.get("schema"), pipeline_cfg.get("namespace")]))
+        self.client = SnowflakeClient(config, tag_prefix or "environment")
         self.env = _EnvOps(self.client, config, pipeline_cfg)
         self.raw = _RawOps(self.client, config, pipeline_cfg)
         self.stage = _StagingOps(self.client, config, pipeline_cfg)
         self.pipe = _PipeOps(self.client, config, pipeline_cfg)
         self.curated = _CuratedOps(self.client, config, pipeline_cfg)
+        self.quality = _QualityOps(self.client, config, pipeline_cfg)
+        self.checkpoints = _CheckpointOps(self.client, config, pipeline_cfg)
+        self.query_stats = _QueryStatsOps(self.client, config, pipeline_cfg, run_id)
+        self.leases = LeaseManager(config)
         self.config = config
+        self.batch_id = batch_id
+
+    def _table_ref(self, database: str) -> str:
+        """Fully qualified name of this pipeline's table in a layer database (lease resource)."""
+        return f"{database}.{self.stage.schema}.{self.stage.table}"
+
+    def _leased(self, resource: str, fn):
+        """Wrap a step so it fails before being checkpointed if its lease was lost meanwhile."""
+
+        def run():
+            result = fn()
+            self.leases.check(resource)
+            return result
+
+        return run
 
     # ------------------------------------------------------------------
     # Environment and staging
@@ -24,33 +47,57 @@ class SnowflakePipeline:
 
     def stage_files(self, local_dir: str):
         """Upload local files into the Snowflake stage."""
-        self.env.stage_files(local_dir)
+        inputs = {"objects": read_manifest(local_dir).get("objects", [])}
+        self.checkpoints.run(self.batch_id, "stage", lambda: self.env.stage_files(local_dir), inputs)
+
+    def is_staged(self, objects: list[str]) -> bool:
+        """True if this batch's files were already staged by an earlier run."""
+        if not (self.checkpoints.enabled and self.batch_id):
+            return False
+        return self.checkpoints.is_complete(self.batch_id, "stage", {"objects": objects})
 
     # ------------------------------------------------------------------
     # RAW and STAGING layer orchestration
     # ------------------------------------------------------------------
 
-    def build_raw(self):
-        """Infer schema, create, and evolve the RAW layer."""
-        self.raw.create_inferred_table()
+    def build_raw(self, stage: str | None = None):
+        """Infer schema, create, and evolve the RAW layer (from `stage`, default the pipe's stage)."""
+        resource = self._table_ref(self.raw.raw_db)
+        with self.leases.hold(resource):
+            step = self._leased(resource, lambda: self.raw.create_inferred_table(stage))
+            self.checkpoints.run(self.batch_id, "raw", step)
 
     def build_staging(self):
         """Recreate and merge the STAGING layer with deduplication and evolution."""
+        resource = self._table_ref(self.stage.staging_db)
+        with self.leases.hold(resource):
+            inputs = {"raw_schema": self.checkpoints.schema_hash(self.raw.raw_db)} if self.batch_id else {}
+            self.checkpoints.run(self.batch_id, "staging", self._leased(resource, self._merge_staging), inputs)
+
+    def _merge_staging(self):
         self.stage.create()
         self.stage.evolve()
         self.stage.merge()
 
+    def profile_staging(self):
+        """Run the single-scan data quality profile on the STAGING table, if enabled."""
+        if not self.quality.enabled:
+            return None
+        return self.quality.profile()
+
     # ------------------------------------------------------------------
     # Snowpipe operations
     # ------------------------------------------------------------------
 
     def create_pipe(self):
         """Create or replace Snowpipe for automated ingestion."""
-        self.pipe.create()
+        self.checkpoints.run(self.batch_id, "pipe", self.pipe.create)
 
     def trigger_pipe(self):
         """Trigger Snowpipe ingestion and wait until ingestion completes."""
-        self.pipe.trigger()
+        resource = self._table_ref(self.raw.raw_db)
+        with self.leases.hold(resource):
+            self.checkpoints.run(self.batch_id, "trigger", self._leased(resource, self.pipe.trigger))
 
     # ------------------------------------------------------------------
     # CURATED layer
@@ -58,12 +105,34 @@ class SnowflakePipeline:
 
     def build_curated(self):
         """Generate curated subsets or secure views from the STAGING layer."""
-        self.curated.create_subsets()
+        resource = self._table_ref(self.curated.curated_db)
+        with self.leases.hold(resource):
+            self.checkpoints.run(self.batch_id, "curated", self._leased(resource, self.curated.create_subsets))
+
+    # ------------------------------------------------------------------
+    # Query profiling
+    # ------------------------------------------------------------------
+
+    def collect_query_stats(self):
+        """Persist operator stats for the statements this pipeline ran so far (best effort)."""
+        query_log, self.client.query_log = self.client.query_log, []
+        if not self.query_stats.enabled or not self.query_stats.table:
+            return
+        try:
+            self.query_stats.collect(query_log)
+        except Exception as e:
+            print(f"[WARN] Could not collect query stats for {self.query_stats.schema}.{self.query_stats.table}: {e}")
+
+    def report_query_stats(self) -> list[dict]:
+        """Flag steps whose scan ratio, runtime, or spilling regressed against the baseline."""
+        return self.query_stats.report()
 
     # ------------------------------------------------------------------
     # Lifecycle
     # ------------------------------------------------------------------
 
     def close(self):
-        """Close underlying Snowflake connection."""
+        """Collect query stats, then close underlying Snowflake connections."""
+        self.collect_query_stats()
+        self.leases.close()
         self.client.close()
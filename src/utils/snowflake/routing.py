@@ -0,0 +1,76 @@
+import os
+import functools
+
+
+# Operation classes understood by the router; `global.warehouses` may only route these (plus `default`).
+OPERATION_CLASSES = ("ddl", "infer", "load", "merge", "curated", "monitor")
+
+
+class WarehouseRouter:
+    """
+    Resolve operation classes to warehouses and their sizing hints.
+
+    Configured under `global.warehouses`; each entry is either a plain warehouse
+    name or a mapping with optional hints:
+
+        warehouses:
+          default: COMPUTE_WH
+          ddl: XS_WH
+          merge:
+            name: TRANSFORM_WH
+            size: MEDIUM          # ALTER WAREHOUSE ... SET WAREHOUSE_SIZE before use
+            auto_suspend: 60      # ALTER WAREHOUSE ... SET AUTO_SUSPEND before use
+            suspend_after: true   # ALTER WAREHOUSE ... SUSPEND once the last step using it finishes
+
+    Without config every operation routes to SNOWFLAKE_WAREHOUSE. Keys other
+    than `default` and OPERATION_CLASSES raise ValueError, so a typo cannot
+    silently send a class to the default warehouse.
+    """
+
+    def __init__(self, config: dict | None = None):
+        warehouses = ((config or {}).get("global", {}) or {}).get("warehouses", {}) or {}
+        unknown = sorted(k for k in warehouses if k != "default" and k.lower() not in OPERATION_CLASSES)
+        if unknown:
+            raise ValueError(
+                f"Unknown operation class(es) in global.warehouses: {', '.join(unknown)} "
+                f"(expected 'default' or one of {', '.join(OPERATION_CLASSES)})."
+            )
+        default = self._normalize(warehouses.get("default")) or {}
+        default.setdefault("name", os.getenv("SNOWFLAKE_WAREHOUSE"))
+        self.default = default
+
+        self.routes = {}
+        for op_class, entry in warehouses.items():
+            if op_class == "default":
+                continue
+            route = self._normalize(entry)
+            if route:
+                route.setdefault("name", self.default["name"])
+                self.routes[op_class.lower()] = route
+
+    @staticmethod
+    def _normalize(entry) -> dict | None:
+        """Accept either a warehouse name or a mapping of name + hints."""
+        if not entry:
+            return None
+        if isinstance(entry, str):
+            return {"name": entry}
+        return dict(entry)
+
+    def resolve(self, op_class: str | None) -> dict:
+        """Return the route (name + hints) for an operation class."""
+        return self.routes.get((op_class or "").lower(), self.default)
+
+
+def routed(op_class: str, step: str):
+    """Decorate an operations method so it runs on the warehouse routed for `op_class`."""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            with self.client.operation(op_class, step):
+                return fn(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,16 @@
+    SELECT
+        {%- set projections = (all_columns | reject('in', exclude_columns) | list) + flatten_projections %}
+        {%- for projection in projections %}
+        {{ projection }}{{ "," if not loop.last }}
+        {%- endfor %}
+    FROM {{ raw_db }}.{{ schema }}.{{ table }}
+    {%- for lateral in flatten_laterals %}
+    , {{ lateral }}
+    {%- endfor %}
+    {%- if source_filter %}
+    WHERE {{ source_filter }}
+    {%- endif %}
+    QUALIFY ROW_NUMBER() OVER (
+        PARTITION BY {{ primary_keys | join(", ") }}
+        ORDER BY {{ sort_keys | join(", ") }}
+    ) = 1
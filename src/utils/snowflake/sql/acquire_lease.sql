@@ -0,0 +1,13 @@
+MERGE INTO {{ database }}.{{ schema }}.{{ table }} AS tgt
+USING (SELECT '{{ resource }}' AS RESOURCE, '{{ owner }}' AS OWNER) AS src
+ON tgt.RESOURCE = src.RESOURCE
+WHEN MATCHED AND (tgt.OWNER = src.OWNER OR tgt.EXPIRES_AT < CURRENT_TIMESTAMP()) THEN
+    UPDATE SET
+        tgt.OWNER = src.OWNER,
+        tgt.ACQUIRED_AT = IFF(tgt.OWNER = src.OWNER, tgt.ACQUIRED_AT, CURRENT_TIMESTAMP()),
+        tgt.HEARTBEAT_AT = CURRENT_TIMESTAMP(),
+        tgt.EXPIRES_AT = DATEADD(SECOND, {{ ttl }}, CURRENT_TIMESTAMP())
+WHEN NOT MATCHED THEN
+    INSERT (RESOURCE, OWNER, ACQUIRED_AT, HEARTBEAT_AT, EXPIRES_AT)
+    VALUES (src.RESOURCE, src.OWNER, CURRENT_TIMESTAMP(), CURRENT_TIMESTAMP(),
+            DATEADD(SECOND, {{ ttl }}, CURRENT_TIMESTAMP()));
@@ -0,0 +1,43 @@
+INSERT INTO {{ database }}.{{ schema }}.{{ table }} (
+    RUN_ID, TARGET_SCHEMA, NAMESPACE, STEP, QUERY_ID, QUERY_TYPE,
+    PARTITIONS_SCANNED, PARTITIONS_TOTAL, BYTES_SCANNED, BYTES_SPILLED, JOIN_OUTPUT_ROWS,
+    ROWS_PRODUCED, COMPILATION_MS, EXECUTION_MS, ELAPSED_MS
+)
+SELECT
+    '{{ run_id }}',
+    '{{ target_schema }}',
+    '{{ namespace }}',
+    ops.STEP,
+    ops.QUERY_ID,
+    qh.QUERY_TYPE,
+    ops.PARTITIONS_SCANNED,
+    ops.PARTITIONS_TOTAL,
+    ops.BYTES_SCANNED,
+    ops.BYTES_SPILLED,
+    ops.JOIN_OUTPUT_ROWS,
+    qh.ROWS_PRODUCED,
+    qh.COMPILATION_TIME,
+    qh.EXECUTION_TIME,
+    qh.TOTAL_ELAPSED_TIME
+FROM (
+    {%- for q in queries %}
+    SELECT
+        '{{ q.step }}' AS STEP,
+        '{{ q.query_id }}' AS QUERY_ID,
+        SUM(OPERATOR_STATISTICS:pruning:partitions_scanned::NUMBER) AS PARTITIONS_SCANNED,
+        SUM(OPERATOR_STATISTICS:pruning:partitions_total::NUMBER) AS PARTITIONS_TOTAL,
+        SUM(OPERATOR_STATISTICS:io:bytes_scanned::NUMBER) AS BYTES_SCANNED,
+        SUM(
+            COALESCE(OPERATOR_STATISTICS:spilling:bytes_spilled_local_storage::NUMBER, 0)
+            + COALESCE(OPERATOR_STATISTICS:spilling:bytes_spilled_remote_storage::NUMBER, 0)
+        ) AS BYTES_SPILLED,
+        ARRAY_AGG(IFF(OPERATOR_TYPE ILIKE '%join%', OPERATOR_STATISTICS:output_rows::NUMBER, NULL)) AS JOIN_OUTPUT_ROWS
+    FROM TABLE(GET_QUERY_OPERATOR_STATS('{{ q.query_id }}'))
+    {{ "UNION ALL" if not loop.last }}
+    {%- endfor %}
+) AS ops
+LEFT JOIN (
+    SELECT QUERY_ID, QUERY_TYPE, ROWS_PRODUCED, COMPILATION_TIME, EXECUTION_TIME, TOTAL_ELAPSED_TIME
+    FROM TABLE({{ database }}.INFORMATION_SCHEMA.QUERY_HISTORY_BY_SESSION(RESULT_LIMIT => 10000))
+) AS qh
+    ON qh.QUERY_ID = ops.QUERY_ID;
@@ -1,5 +1,8 @@
 COPY INTO {{ database }}.{{ schema }}.{{ table }}
-FROM @{{ database }}.{{ schema }}.{{ stage }}
+FROM @{{ database }}.{{ schema }}.{{ stage }}{% if path %}/{{ path }}/{% endif %}
+{% if files %}
+FILES = ({% for f in files %}'{{ f }}'{{ ", " if not loop.last }}{% endfor %})
+{% endif %}
 FILE_FORMAT = '{{ file_format_ref }}'
 MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE
 ON_ERROR = 'CONTINUE'
@@ -0,0 +1,7 @@
+CREATE TABLE IF NOT EXISTS {{ database }}.{{ schema }}.{{ table }} (
+    RESOURCE     STRING NOT NULL,
+    OWNER        STRING NOT NULL,
+    ACQUIRED_AT  TIMESTAMP_LTZ,
+    HEARTBEAT_AT TIMESTAMP_LTZ,
+    EXPIRES_AT   TIMESTAMP_LTZ
+);
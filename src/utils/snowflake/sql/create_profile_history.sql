@@ -0,0 +1,11 @@
+CREATE TABLE IF NOT EXISTS {{ database }}.{{ schema }}.{{ table }} (
+    PROFILED_AT     TIMESTAMP_LTZ DEFAULT CURRENT_TIMESTAMP(),
+    TARGET_DATABASE STRING,
+    TARGET_SCHEMA   STRING,
+    TARGET_TABLE    STRING,
+    SCOPE           STRING,
+    METRICS         VARIANT,
+    VIOLATIONS      ARRAY,
+    PASSED          BOOLEAN,
+    WATERMARK       TIMESTAMP_LTZ
+);
@@ -0,0 +1,18 @@
+CREATE TABLE IF NOT EXISTS {{ database }}.{{ schema }}.{{ table }} (
+    PROFILED_AT        TIMESTAMP_LTZ DEFAULT CURRENT_TIMESTAMP(),
+    RUN_ID             STRING,
+    TARGET_SCHEMA      STRING,
+    NAMESPACE          STRING,
+    STEP               STRING,
+    QUERY_ID           STRING,
+    QUERY_TYPE         STRING,
+    PARTITIONS_SCANNED NUMBER,
+    PARTITIONS_TOTAL   NUMBER,
+    BYTES_SCANNED      NUMBER,
+    BYTES_SPILLED      NUMBER,
+    JOIN_OUTPUT_ROWS   ARRAY,
+    ROWS_PRODUCED      NUMBER,
+    COMPILATION_MS     NUMBER,
+    EXECUTION_MS       NUMBER,
+    ELAPSED_MS         NUMBER
+);
@@ -0,0 +1,8 @@
+CREATE TABLE IF NOT EXISTS {{ database }}.{{ schema }}.{{ table }} (
+    BATCH_ID      STRING NOT NULL,
+    TARGET_SCHEMA STRING NOT NULL,
+    NAMESPACE     STRING NOT NULL,
+    STEP          STRING NOT NULL,
+    INPUTS        VARIANT,
+    COMPLETED_AT  TIMESTAMP_LTZ DEFAULT CURRENT_TIMESTAMP()
+);
@@ -0,0 +1,49 @@
+{%- set insert_cols = (all_columns + flatten_fields) | reject('in', exclude_columns) | list %}
+{%- set target = staging_db ~ "." ~ schema ~ "." ~ table %}
+{%- set src_table = target ~ "__MERGE_SRC" %}
+{%- set parts_table = target ~ "__MERGE_PARTS" %}
+{#- HASH is NULL-safe; a collision only pulls another complete partition into the source, which is then replaced as a whole too #}
+{%- set source_filter = "HASH(" ~ (partition_columns | join(", ")) ~ ") IN (SELECT PARTITION_KEY FROM " ~ parts_table ~ ")" %}
+BEGIN
+    CREATE OR REPLACE TEMPORARY TABLE {{ parts_table }} AS
+    SELECT DISTINCT HASH({{ partition_columns | join(", ") }}) AS PARTITION_KEY
+    FROM {{ raw_db }}.{{ schema }}.{{ table }}
+    WHERE {{ watermark_column }} > (
+        SELECT COALESCE(MAX({{ watermark_column }}), TO_TIMESTAMP_LTZ(0))
+        FROM {{ target }}
+    );
+
+    CREATE OR REPLACE TEMPORARY TABLE {{ src_table }} AS
+{% include "_dedup_source.sql" %};
+
+    BEGIN TRANSACTION;
+
+    DELETE FROM {{ target }} AS tgt
+    USING {{ parts_table }} AS parts
+    WHERE HASH(
+        {%- for col in partition_columns %}
+        tgt.{{ col }}{{ "," if not loop.last }}
+        {%- endfor %}
+    ) = parts.PARTITION_KEY;
+
+    INSERT INTO {{ target }} (
+        {%- for col in insert_cols %}
+        {{ col }}{% if not loop.last %},{% endif %}
+        {%- endfor %}
+    )
+    SELECT
+        {%- for col in insert_cols %}
+        {{ col }}{% if not loop.last %},{% endif %}
+        {%- endfor %}
+    FROM {{ src_table }};
+
+    COMMIT;
+    DROP TABLE IF EXISTS {{ src_table }};
+    DROP TABLE IF EXISTS {{ parts_table }};
+EXCEPTION
+    WHEN OTHER THEN
+        ROLLBACK;
+        DROP TABLE IF EXISTS {{ src_table }};
+        DROP TABLE IF EXISTS {{ parts_table }};
+        RAISE;
+END;
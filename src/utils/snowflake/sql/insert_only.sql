@@ -0,0 +1,21 @@
+{%- set insert_cols = (all_columns + flatten_fields) | reject('in', exclude_columns) | list %}
+INSERT INTO {{ staging_db }}.{{ schema }}.{{ table }} (
+    {%- for col in insert_cols %}
+    {{ col }}{% if not loop.last %},{% endif %}
+    {%- endfor %}
+)
+SELECT
+    {%- for col in insert_cols %}
+    src.{{ col }}{% if not loop.last %},{% endif %}
+    {%- endfor %}
+FROM (
+{% include "_dedup_source.sql" %}
+) AS src
+WHERE NOT EXISTS (
+    SELECT 1
+    FROM {{ staging_db }}.{{ schema }}.{{ table }} AS tgt
+    WHERE
+        {%- for pk in primary_keys %}
+        tgt.{{ pk }} = src.{{ pk }}{{ " AND" if not loop.last }}
+        {%- endfor %}
+);
@@ -1,33 +1,6 @@
 MERGE INTO {{ staging_db }}.{{ schema }}.{{ table }} AS tgt
 USING (
-    SELECT
-        {%- for col in all_columns if col not in exclude_columns %}
-        {{ col }}{% if not loop.last or flatten_columns %},{% endif %}
-        {%- endfor %}
-
-        {# --- flatten fields without parent access --- #}
-        {%- if flatten_columns %}
-            {%- set flat_fields = [] %}
-            {%- for flatten in flatten_columns %}
-                {%- for field in flatten.fields %}
-                    {%- set _ = flat_fields.append(field) %}
-                {%- endfor %}
-            {%- endfor %}
-            {%- for field in flat_fields %}
-            {{ field }}{% if not loop.last %},{% endif %}
-            {%- endfor %}
-        {%- endif %}
-
-    FROM {{ raw_db }}.{{ schema }}.{{ table }}
-    {%- if flatten_columns %}
-        {%- for flatten in flatten_columns %}
-        , LATERAL FLATTEN(input => {{ flatten.column }}) AS {{ flatten.column | lower }}_flat
-        {%- endfor %}
-    {%- endif %}
-    QUALIFY ROW_NUMBER() OVER (
-        PARTITION BY {{ primary_keys | join(", ") }}
-        ORDER BY {{ sort_keys | join(", ") }}
-    ) = 1
+{% include "_dedup_source.sql" %}
 ) AS src
 ON
     {%- for pk in primary_keys %}
@@ -0,0 +1,36 @@
+WITH agg AS (
+    SELECT
+        GROUPING({{ file_column }}) AS is_total,
+        {{ file_column }} AS file_name,
+        COUNT(*) AS row_count,
+        {%- if primary_keys %}
+        COUNT(DISTINCT {{ primary_keys | join(", ") }}) AS distinct_keys,
+        COUNT_IF({% for pk in primary_keys %}{{ pk }} IS NULL{{ " OR " if not loop.last }}{% endfor %}) AS null_keys,
+        {%- endif %}
+        {%- for col in null_columns %}
+        COUNT_IF({{ col }} IS NULL) AS nulls_{{ loop.index }},
+        {%- endfor %}
+        MAX({{ watermark_column }}) AS watermark
+    FROM {{ database }}.{{ schema }}.{{ table }}
+    {%- if since %}
+    WHERE {{ watermark_column }} > TO_TIMESTAMP_LTZ('{{ since }}', '{{ timestamp_format }}')
+    {%- endif %}
+    GROUP BY GROUPING SETS (({{ file_column }}), ())
+)
+SELECT OBJECT_CONSTRUCT(
+    'row_count', MAX(IFF(is_total = 1, row_count, NULL)),
+    {%- if primary_keys %}
+    'null_keys', MAX(IFF(is_total = 1, null_keys, NULL)),
+    'duplicate_keys', MAX(IFF(is_total = 1, row_count - null_keys - distinct_keys, NULL)),
+    {%- endif %}
+    'null_rates', OBJECT_CONSTRUCT(
+        {%- for col in null_columns %}
+        '{{ col }}', MAX(IFF(is_total = 1, nulls_{{ loop.index }} / NULLIF(row_count, 0), NULL)){{ "," if not loop.last }}
+        {%- endfor %}
+    ),
+    'file_count', COUNT_IF(is_total = 0),
+    'min_rows_per_file', MIN(IFF(is_total = 0, row_count, NULL)),
+    'file_row_counts', OBJECT_AGG(IFF(is_total = 0, file_name, NULL), IFF(is_total = 0, row_count, NULL)::VARIANT),
+    'watermark', TO_VARCHAR(MAX(IFF(is_total = 1, watermark, NULL)), '{{ timestamp_format }}')
+)
+FROM agg;
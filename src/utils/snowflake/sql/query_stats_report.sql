@@ -0,0 +1,34 @@
+WITH runs AS (
+    SELECT
+        RUN_ID,
+        STEP,
+        MIN(PROFILED_AT) AS RUN_AT,
+        SUM(PARTITIONS_SCANNED) / NULLIF(SUM(PARTITIONS_TOTAL), 0) AS SCAN_RATIO,
+        SUM(ELAPSED_MS) AS ELAPSED_MS,
+        SUM(COMPILATION_MS) AS COMPILATION_MS,
+        SUM(BYTES_SPILLED) AS BYTES_SPILLED
+    FROM {{ database }}.{{ schema }}.{{ table }}
+    WHERE TARGET_SCHEMA = '{{ target_schema }}'
+      AND NAMESPACE = '{{ namespace }}'
+    GROUP BY RUN_ID, STEP
+),
+ranked AS (
+    SELECT *, ROW_NUMBER() OVER (PARTITION BY STEP ORDER BY RUN_AT DESC) AS RN
+    FROM runs
+)
+SELECT
+    cur.STEP,
+    cur.SCAN_RATIO,
+    AVG(base.SCAN_RATIO) AS BASELINE_SCAN_RATIO,
+    cur.ELAPSED_MS,
+    MEDIAN(base.ELAPSED_MS) AS BASELINE_ELAPSED_MS,
+    cur.BYTES_SPILLED,
+    MAX(base.BYTES_SPILLED) AS BASELINE_BYTES_SPILLED,
+    COUNT(base.RUN_ID) AS BASELINE_RUNS
+FROM ranked AS cur
+JOIN ranked AS base
+    ON base.STEP = cur.STEP
+   AND base.RN BETWEEN 2 AND {{ baseline_runs + 1 }}
+WHERE cur.RN = 1
+GROUP BY cur.STEP, cur.SCAN_RATIO, cur.ELAPSED_MS, cur.BYTES_SPILLED
+ORDER BY cur.STEP;
@@ -0,0 +1,295 @@
+import os
+import queue
+import tempfile
+import threading
+import time
+
+from src.utils.helpers import compute_batch_id
+from src.utils.minio_client import MinioClient
+from src.utils.snowflake.pipeline import SnowflakePipeline
+
+
+_DONE = object()  # End-of-stream sentinel passed between stages
+
+
+class StreamingIngest:
+    """
+    Pipelined MinIO → Snowflake stage → RAW ingestion.
+
+    Each object flows through three stages connected by bounded queues:
+
+      download (MinIO → local)  →  upload (PUT → stage)  →  load (COPY / REFRESH)
+
+    Every stage runs its own pool of worker threads. A full queue blocks the
+    upstream workers, so memory and local disk usage stay bounded while total
+    wall time approaches that of the slowest stage.
+
+    Configured per pipeline under the optional `streaming` key:
+
+        streaming:
+          enabled: true
+          download_workers: 4
+          upload_workers: 4
+          load_workers: 1
+          queue_size: 8
+          batch_size: 10          # files per COPY / REFRESH
+          batch_interval: 5       # seconds before a partial batch is flushed
+          load_mode: copy         # copy | refresh
+
+    `run()` derives a batch id from the listed objects and their etags; with
+    `global.checkpoints` enabled the whole stream is recorded as the batch's
+    `trigger` step, so a rerun over unchanged objects skips it.
+    """
+
+    def __init__(self, config: dict, pipeline_cfg: dict, run_id: str | None = None):
+        self.config = config
+        self.pipeline_cfg = pipeline_cfg
+        self.run_id = run_id
+
+        stream_cfg = pipeline_cfg.get("streaming", {}) or {}
+        self.download_workers = int(stream_cfg.get("download_workers", 4))
+        self.upload_workers = int(stream_cfg.get("upload_workers", 4))
+        self.load_workers = int(stream_cfg.get("load_workers", 1))
+        self.queue_size = int(stream_cfg.get("queue_size", 8))
+        self.batch_size = int(stream_cfg.get("batch_size", 10))
+        self.batch_interval = float(stream_cfg.get("batch_interval", 5))
+        self.load_mode = stream_cfg.get("load_mode", "copy").lower()
+        self.batch_id = None
+
+        if self.load_mode not in ("copy", "refresh"):
+            raise ValueError(f"Unsupported streaming load_mode '{self.load_mode}' (expected 'copy' or 'refresh').")
+
+        self._objects: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        self._downloaded: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        self._staged: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        self._stop = threading.Event()
+        self._errors: list[BaseException] = []
+        self._raw_lock = threading.Lock()
+        self._raw_ready = False
+        self._loaded: list[str] = []
+        self._loaded_lock = threading.Lock()
+        self._local_names: dict[str, str] = {}
+
+    # ------------------------------------------------------------------
+    # Entry point
+    # ------------------------------------------------------------------
+
+    def run(self) -> list[str]:
+        """Stream all objects under the pipeline's bucket path as one checkpointed batch; return loaded stage paths."""
+        minio = MinioClient(self.config)
+        minio.ensure_bucket()
+        prefix = self.pipeline_cfg["bucket_path"].lower()
+        listing = minio.list_objects_with_etags(prefix=prefix)
+        objects = sorted(name for name, _ in listing)
+        self.batch_id = compute_batch_id(listing)
+
+        sf = SnowflakePipeline(self.config, self.pipeline_cfg, self.batch_id, self.run_id)
+        try:
+            loaded = sf.checkpoints.run(
+                self.batch_id, "trigger", lambda: self.run_objects(objects, minio), {"objects": objects}
+            )
+        finally:
+            sf.close()
+        return loaded or []
+
+    def run_objects(self, objects: list[str], minio: MinioClient | None = None) -> list[str]:
+        """Stream an explicit list of object names through download → upload → load."""
+        if not objects:
+            print(f"[INFO] No objects to stream for {self.pipeline_cfg['namespace']}")
+            return []
+
+        self._local_names = self._plan_local_names(objects)
+        minio = minio or MinioClient(self.config)
+        tmp_dir = tempfile.mkdtemp(prefix=f"minio_{self.pipeline_cfg['namespace'].lower()}_")
+
+        sf = SnowflakePipeline(self.config, self.pipeline_cfg, run_id=self.run_id)
+        try:
+            sf.env.ensure_stage()
+        finally:
+            sf.close()
+
+        downloaders = [
+            threading.Thread(target=self._download_worker, args=(minio, tmp_dir), daemon=True)
+            for _ in range(self.download_workers)
+        ]
+        uploaders = [
+            threading.Thread(target=self._upload_worker, daemon=True)
+            for _ in range(self.upload_workers)
+        ]
+        loaders = [
+            threading.Thread(target=self._load_worker, daemon=True)
+            for _ in range(self.load_workers)
+        ]
+
+        start = time.time()
+        for t in downloaders + uploaders + loaders:
+            t.start()
+
+        for obj in objects:
+            if not self._put(self._objects, obj):
+                break
+        for _ in downloaders:
+            self._put(self._objects, _DONE)
+        self._finish_stage(downloaders, self._downloaded, len(uploaders))
+        self._finish_stage(uploaders, self._staged, len(loaders))
+        for t in loaders:
+            t.join()
+
+        if self._errors:
+            raise self._errors[0]
+
+        if self.load_mode == "refresh" and self._loaded:
+            sf = SnowflakePipeline(self.config, self.pipeline_cfg, run_id=self.run_id)
+            try:
+                sf.pipe.wait()
+            finally:
+                sf.close()
+
+        print(
+            f"[INFO] Streamed {len(self._loaded)} file(s) for {self.pipeline_cfg['namespace']} "
+            f"in {time.time() - start:.1f}s"
+        )
+        return list(self._loaded)
+
+    def _plan_local_names(self, objects: list[str]) -> dict[str, str]:
+        """
+        Map each object to a flat local (and stage) file name derived from its key
+        relative to `bucket_path`, e.g. 'events/2024/01/a.csv' → '2024__01__a.csv',
+        so equal file names in different subfolders never share a path.
+        """
+        prefix = self.pipeline_cfg.get("bucket_path", "").strip("/").lower()
+        names = {}
+        for obj in objects:
+            relative = obj[len(prefix) + 1:] if prefix and obj.startswith(prefix + "/") else obj
+            names[obj] = relative.strip("/").replace("/", "__")
+
+        seen = {}
+        for obj, name in names.items():
+            if name in seen:
+                raise ValueError(f"Objects '{seen[name]}' and '{obj}' both map to local file '{name}'.")
+            seen[name] = obj
+        return names
+
+    # ------------------------------------------------------------------
+    # Stage workers
+    # ------------------------------------------------------------------
+
+    def _download_worker(self, minio: MinioClient, tmp_dir: str):
+        """Download objects from MinIO and hand local paths to the upload stage."""
+        while True:
+            obj = self._get(self._objects)
+            if obj is _DONE:
+                return
+            try:
+                local_path = os.path.join(tmp_dir, self._local_names[obj])
+                minio.download(obj, local_path)
+                if not self._put(self._downloaded, local_path):
+                    return
+            except Exception as e:
+                self._fail(e)
+                return
+
+    def _upload_worker(self):
+        """PUT local files into the Snowflake stage on a dedicated connection."""
+        sf = None
+        try:
+            sf = SnowflakePipeline(self.config, self.pipeline_cfg, run_id=self.run_id)
+            while True:
+                local_path = self._get(self._downloaded)
+                if local_path is _DONE:
+                    return
+                staged = sf.env.stage_file(local_path)
+                os.remove(local_path)
+                if not self._put(self._staged, staged):
+                    return
+        except Exception as e:
+            self._fail(e)
+        finally:
+            if sf:
+                sf.close()
+
+    def _load_worker(self):
+        """Group staged files into micro-batches and load each batch into RAW."""
+        sf = None
+        batch: list[str] = []
+        deadline = None
+        try:
+            sf = SnowflakePipeline(self.config, self.pipeline_cfg, run_id=self.run_id)
+            while not self._stop.is_set():
+                timeout = 1 if deadline is None else min(max(deadline - time.time(), 0), 1)
+                try:
+                    item = self._staged.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+
+                if item is _DONE:
+                    self._load_batch(sf, batch)
+                    return
+                if item is not None:
+                    batch.append(item)
+                    deadline = deadline or time.time() + self.batch_interval
+
+                if len(batch) >= self.batch_size or (deadline and time.time() >= deadline):
+                    self._load_batch(sf, batch)
+                    batch, deadline = [], None
+        except Exception as e:
+            self._fail(e)
+        finally:
+            if sf:
+                sf.close()
+
+    def _load_batch(self, sf: SnowflakePipeline, batch: list[str]):
+        """Load a micro-batch, bootstrapping the RAW table and pipe on first use."""
+        if not batch:
+            return
+
+        with self._raw_lock:
+            if not self._raw_ready:
+                sf.build_raw()
+                sf.create_pipe()
+                self._raw_ready = True
+
+        if self.load_mode == "copy":
+            sf.pipe.copy_files(batch)
+        else:
+            sf.pipe.refresh()
+
+        with self._loaded_lock:
+            self._loaded.extend(batch)
+
+    # ------------------------------------------------------------------
+    # Queue plumbing
+    # ------------------------------------------------------------------
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        """Blocking put that gives up once the stream has been aborted."""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue):
+        """Blocking get that returns the end-of-stream sentinel once the stream is aborted."""
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _finish_stage(self, workers: list, outbox: queue.Queue, downstream: int):
+        """Close a stage once its inbox has been signalled: wait for its workers, then signal the next stage."""
+        for t in workers:
+            t.join()
+        for _ in range(downstream):
+            self._put(outbox, _DONE)
+
+    def _fail(self, error: BaseException):
+        """Record the first failure and abort all stages."""
+        print(f"[ERROR] Streaming ingestion failed: {error}")
+        self._errors.append(error)
+        self._stop.set()
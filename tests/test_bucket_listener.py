@@ -0,0 +1,75 @@
+import pytest
+
+from src.utils import bucket_listener
+from src.utils.bucket_listener import BucketListener
+
+
+def _listener(dispatch=None, **notifications) -> BucketListener:
+    config = {
+        "global": {"bucket_name": "Lake", "notifications": {"debounce_seconds": 10, "max_wait_seconds": 60, **notifications}},
+        "pipelines": [
+            {"namespace": "EVENTS", "bucket_path": "events/"},
+            {"namespace": "CLICKS", "bucket_path": "events/clicks"},
+        ],
+    }
+    return BucketListener([config], ["config.yaml"], dispatch=dispatch or (lambda *_: None))
+
+
+def test_match_prefers_the_longest_bucket_path():
+    listener = _listener()
+    assert listener.match("lake", "events/clicks/a.csv") == "CLICKS"
+    assert listener.match("LAKE", "Events/views/a.csv") == "EVENTS"
+    assert listener.match("lake", "events/clicks.csv") == "EVENTS"
+    assert listener.match("lake", "other/a.csv") is None
+    assert listener.match("other", "events/a.csv") is None
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(bucket_listener.time, "time", lambda: now[0])
+    return now
+
+
+def test_batch_is_due_once_quiet_for_the_debounce_window(clock):
+    listener = _listener()
+    listener.on_object("lake", "events/a.csv")
+    clock[0] += 9
+    listener.on_object("lake", "events/b.csv")
+    clock[0] += 9
+    assert listener._due_batches() == []
+    clock[0] += 1
+    assert listener._due_batches() == [("EVENTS", ["events/a.csv", "events/b.csv"])]
+    assert listener._due_batches() == []
+
+
+def test_batch_is_due_after_max_wait_even_while_objects_keep_arriving(clock):
+    listener = _listener()
+    for i in range(12):
+        listener.on_object("lake", f"events/{i:02d}.csv")
+        assert listener._due_batches() == []
+        clock[0] += 5
+    listener.on_object("lake", "events/12.csv")
+    assert [ns for ns, _ in listener._due_batches()] == ["EVENTS"]
+
+
+def test_run_drains_pending_batches_on_ctrl_c_even_when_dispatch_fails(monkeypatch):
+    dispatched = []
+
+    def dispatch(namespace, objects):
+        dispatched.append(namespace)
+        raise RuntimeError("prefect api down")
+
+    listener = _listener(dispatch=dispatch)
+    monkeypatch.setattr(listener, "_listen", lambda cfg: None)
+    listener.on_object("lake", "events/a.csv")
+    listener.on_object("lake", "events/clicks/b.csv")
+
+    def interrupt(_):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(listener._stop, "wait", interrupt)
+    listener.run()
+
+    assert sorted(dispatched) == ["CLICKS", "EVENTS"]
+    assert listener._pending == {}
@@ -0,0 +1,175 @@
+import pytest
+
+from src.utils.helpers import render_template
+from src.utils.snowflake.flatten import parse_field, plan_flatten
+
+
+FLATTEN_COLUMNS = [
+    {
+        "column": "EVENT_METADATA",
+        "fields": [
+            "EVENT_METADATA:user_id::NUMBER AS USER_ID",
+            "EVENT_METADATA:device::STRING AS DEVICE",
+        ],
+    }
+]
+
+
+def _normalize(sql: str) -> str:
+    return " ".join(sql.split())
+
+
+def _render_merge(flatten_columns):
+    plan = plan_flatten(flatten_columns)
+    return _normalize(render_template(
+        "merge_into.sql",
+        {
+            "raw_db": "RAW",
+            "staging_db": "STAGING",
+            "schema": "S",
+            "table": "T",
+            "all_columns": ["ID", "EVENT_METADATA", "__INGESTED_TIMESTAMP"],
+            "exclude_columns": ["EVENT_METADATA"],
+            "primary_keys": ["ID"],
+            "sort_keys": ["__INGESTED_TIMESTAMP"],
+            "flatten_projections": plan.projections,
+            "flatten_laterals": plan.laterals,
+            "flatten_fields": plan.aliases,
+        },
+    ))
+
+
+# ---------------------------------------------------------------------
+# FIELD PARSER
+# ---------------------------------------------------------------------
+
+def test_parse_field_splits_path_cast_and_alias():
+    f = parse_field("EVENT_METADATA:user_id::NUMBER AS USER_ID")
+    assert (f.root, f.path, f.cast, f.alias) == ("EVENT_METADATA", ":user_id", "NUMBER", "USER_ID")
+
+
+def test_parse_field_ignores_as_inside_path():
+    f = parse_field("EVENT_METADATA:last_ASSET::STRING as LAST_ASSET")
+    assert f.path == ":last_ASSET"
+    assert f.alias == "LAST_ASSET"
+
+
+def test_parse_field_derives_alias_from_last_segment():
+    assert parse_field("EVENT_METADATA:geo.city::STRING").alias == "CITY"
+
+
+def test_parse_field_keeps_whitespace_inside_quoted_keys():
+    f = parse_field('EVENT_METADATA : "user name" :: STRING AS USER_NAME')
+    assert f.expression == 'EVENT_METADATA:"user name"::STRING'
+
+
+def test_parse_field_rejects_expression_without_alias_source():
+    with pytest.raises(ValueError):
+        parse_field("EVENT_METADATA::STRING")
+
+
+# ---------------------------------------------------------------------
+# PLANNER
+# ---------------------------------------------------------------------
+
+def test_scalar_fields_are_plain_projections_without_flatten():
+    plan = plan_flatten(FLATTEN_COLUMNS)
+    assert plan.laterals == []
+    assert plan.aliases == ["USER_ID", "DEVICE"]
+    assert plan.projections[0] == "EVENT_METADATA:user_id::NUMBER AS USER_ID"
+
+
+def test_explode_emits_qualified_lateral_flatten():
+    plan = plan_flatten([
+        {
+            "column": "EVENT_METADATA",
+            "explode": True,
+            "path": "items",
+            "outer": True,
+            "fields": ["VALUE:sku::STRING AS ITEM_SKU", "INDEX AS ITEM_INDEX"],
+        }
+    ])
+    assert plan.laterals == [
+        "LATERAL FLATTEN(input => EVENT_METADATA:items, OUTER => TRUE) AS event_metadata_flat"
+    ]
+    assert plan.projections == [
+        "event_metadata_flat.VALUE:sku::STRING AS ITEM_SKU",
+        "event_metadata_flat.INDEX AS ITEM_INDEX",
+    ]
+
+
+def test_exploding_two_arrays_of_one_column_uses_distinct_aliases():
+    plan = plan_flatten([
+        {"column": "EVENT_METADATA", "explode": True, "path": "items", "fields": ["VALUE:sku::STRING AS ITEM_SKU"]},
+        {"column": "EVENT_METADATA", "explode": True, "path": "tags", "fields": ["VALUE::STRING AS TAG"]},
+    ])
+    assert plan.laterals == [
+        "LATERAL FLATTEN(input => EVENT_METADATA:items) AS event_metadata_flat",
+        "LATERAL FLATTEN(input => EVENT_METADATA:tags) AS event_metadata_flat_2",
+    ]
+    assert plan.projections == [
+        "event_metadata_flat.VALUE:sku::STRING AS ITEM_SKU",
+        "event_metadata_flat_2.VALUE::STRING AS TAG",
+    ]
+
+
+def test_explode_fields_must_reference_array_element():
+    with pytest.raises(ValueError):
+        plan_flatten([{"column": "EVENT_METADATA", "explode": True, "fields": ["EVENT_METADATA:x AS X"]}])
+
+
+def test_explode_requires_an_exploded_alias_in_primary_keys():
+    exploded = [{"column": "EVENT_METADATA", "explode": True, "fields": ["INDEX AS ITEM_INDEX", "VALUE AS ITEM"]}]
+    with pytest.raises(ValueError):
+        plan_flatten(exploded, primary_keys=["ID"])
+    assert plan_flatten(exploded, primary_keys=["ID", "item_index"]).aliases == ["ITEM_INDEX", "ITEM"]
+
+
+def test_duplicate_aliases_are_rejected():
+    with pytest.raises(ValueError):
+        plan_flatten([{"column": "C", "fields": ["C:a AS X", "C:b AS X"]}])
+
+
+# ---------------------------------------------------------------------
+# GENERATED SQL
+# ---------------------------------------------------------------------
+
+def test_merge_sql_has_no_lateral_flatten_for_scalar_fields():
+    sql = _render_merge(FLATTEN_COLUMNS)
+    assert "FLATTEN" not in sql
+    assert (
+        "SELECT ID, __INGESTED_TIMESTAMP, EVENT_METADATA:user_id::NUMBER AS USER_ID, "
+        "EVENT_METADATA:device::STRING AS DEVICE FROM RAW.S.T QUALIFY"
+    ) in sql
+    assert "tgt.USER_ID = src.USER_ID" in sql
+    assert "INSERT ( ID, __INGESTED_TIMESTAMP, USER_ID, DEVICE )" in sql
+
+
+def test_merge_sql_joins_lateral_flatten_only_for_exploded_arrays():
+    sql = _render_merge(FLATTEN_COLUMNS + [
+        {"column": "EVENT_METADATA", "explode": True, "path": "items", "fields": ["VALUE:sku::STRING AS ITEM_SKU"]}
+    ])
+    assert sql.count("LATERAL FLATTEN") == 1
+    assert "FROM RAW.S.T , LATERAL FLATTEN(input => EVENT_METADATA:items) AS event_metadata_flat QUALIFY" in sql
+
+
+def test_create_staging_sql_projects_fields_without_flatten():
+    plan = plan_flatten(FLATTEN_COLUMNS)
+    sql = _normalize(render_template(
+        "create_staging_table.sql",
+        {
+            "raw_db": "RAW",
+            "staging_db": "STAGING",
+            "schema": "S",
+            "table": "T",
+            "all_columns": ["ID"],
+            "exclude_columns": ["EVENT_METADATA"],
+            "flatten_projections": plan.projections,
+            "flatten_laterals": plan.laterals,
+        },
+    ))
+    assert sql == (
+        "CREATE TABLE IF NOT EXISTS STAGING.S.T AS SELECT ID, "
+        "EVENT_METADATA:user_id::NUMBER AS USER_ID, EVENT_METADATA:device::STRING AS DEVICE "
+        "FROM RAW.S.T LIMIT 0;"
+    )
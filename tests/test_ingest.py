@@ -0,0 +1,42 @@
+import json
+import os
+
+import pytest
+
+from src.utils import ingest
+
+
+class _StubPipeline:
+    def __init__(self, config, pipeline_cfg):
+        pass
+
+    def close(self):
+        pass
+
+
+def _failing_load(self, sf, batch):
+    raise RuntimeError("warehouse unavailable")
+
+
+def test_close_spills_records_that_cannot_be_flushed(monkeypatch, tmp_path):
+    monkeypatch.setattr(ingest, "SnowflakePipeline", _StubPipeline)
+    monkeypatch.setattr(ingest._NamespaceBuffer, "_load", _failing_load)
+
+    pipeline_cfg = {
+        "namespace": "events",
+        "ingest": {"max_batch_seconds": 0.05, "close_retries": 1, "spill_dir": str(tmp_path)},
+    }
+    buffer = ingest._NamespaceBuffer({}, pipeline_cfg)
+    buffer.submit([{"id": 1}, {"id": 2}])
+
+    with pytest.raises(RuntimeError, match="failed"):
+        buffer.flush()
+    with pytest.raises(RuntimeError, match="written to"):
+        buffer.close()
+
+    assert not buffer._thread.is_alive()
+    (spill_file,) = os.listdir(tmp_path)
+    with open(tmp_path / spill_file) as f:
+        assert [json.loads(line) for line in f] == [{"id": 1}, {"id": 2}]
+    with pytest.raises(RuntimeError, match="stopped"):
+        buffer.flush()
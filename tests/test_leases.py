@@ -0,0 +1,47 @@
+from contextlib import nullcontext
+
+from src.utils.snowflake.leases import LeaseManager
+
+
+class _StubClient:
+    """Answers the ownership check with fixed (mine, others) counts and records every statement."""
+
+    def __init__(self, mine: int, others: int):
+        self.counts = (mine, others)
+        self.statements = []
+
+    def operation(self, *_):
+        return nullcontext()
+
+    def execute(self, sql: str):
+        self.statements.append(sql)
+        return [self.counts] if "COUNT_IF" in sql else []
+
+
+def _manager(client: _StubClient) -> LeaseManager:
+    config = {"global": {"utils_database": "UTILS", "utils_schema": "UTILS", "leases": {"enabled": True}}}
+    manager = LeaseManager(config)
+    manager._client = client
+    manager._ensured = True
+    return manager
+
+
+def test_lease_is_owned_when_no_other_live_row_exists():
+    client = _StubClient(mine=1, others=0)
+    assert _manager(client).try_acquire("R")
+    assert not any(sql.startswith("DELETE") for sql in client.statements)
+
+
+def test_duplicate_insert_is_not_owned_and_our_row_is_removed():
+    client = _StubClient(mine=1, others=1)
+    manager = _manager(client)
+    assert not manager.try_acquire("R")
+    assert client.statements[-1] == (
+        f"DELETE FROM UTILS.UTILS.PIPELINE_LEASES WHERE RESOURCE = 'R' AND OWNER = '{manager.owner}';"
+    )
+
+
+def test_lease_held_by_another_worker_is_left_alone():
+    client = _StubClient(mine=0, others=1)
+    assert not _manager(client).try_acquire("R")
+    assert not any(sql.startswith("DELETE") for sql in client.statements)
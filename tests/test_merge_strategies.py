@@ -0,0 +1,95 @@
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+import pytest
+
+from src.utils.helpers import render_template
+from src.utils.snowflake.flatten import plan_flatten
+from src.utils.snowflake.operations import _StagingOps
+
+
+FLATTEN_COLUMNS = [
+    {"column": "EVENT_METADATA", "fields": ["EVENT_METADATA:user_id::NUMBER AS USER_ID"]},
+]
+
+DEDUP_SELECT = "SELECT ID, EVENT_DATE, __INGESTED_TIMESTAMP, EVENT_METADATA:user_id::NUMBER AS USER_ID FROM RAW.S.T "
+DEDUP_QUALIFY = "QUALIFY ROW_NUMBER() OVER ( PARTITION BY ID ORDER BY __INGESTED_TIMESTAMP ) = 1"
+PARTITION_FILTER = "WHERE HASH(EVENT_DATE) IN (SELECT PARTITION_KEY FROM STAGING.S.T__MERGE_PARTS) "
+
+
+def _normalize(sql: str) -> str:
+    return " ".join(sql.split())
+
+
+def _render(strategy: str) -> str:
+    plan = plan_flatten(FLATTEN_COLUMNS)
+    return _normalize(render_template(
+        _StagingOps.MERGE_TEMPLATES[strategy],
+        {
+            "raw_db": "RAW",
+            "staging_db": "STAGING",
+            "schema": "S",
+            "table": "T",
+            "all_columns": ["ID", "EVENT_DATE", "EVENT_METADATA", "__INGESTED_TIMESTAMP"],
+            "exclude_columns": ["EVENT_METADATA"],
+            "primary_keys": ["ID"],
+            "sort_keys": ["__INGESTED_TIMESTAMP"],
+            "flatten_projections": plan.projections,
+            "flatten_laterals": plan.laterals,
+            "flatten_fields": plan.aliases,
+            "partition_columns": ["EVENT_DATE"],
+            "watermark_column": "__INGESTED_TIMESTAMP",
+        },
+    ))
+
+
+@pytest.mark.parametrize("strategy", sorted(_StagingOps.MERGE_TEMPLATES))
+def test_every_strategy_shares_dedup_source(strategy):
+    sql = _render(strategy)
+    source_filter = PARTITION_FILTER if strategy == "delete_insert" else ""
+    assert DEDUP_SELECT + source_filter + DEDUP_QUALIFY in sql
+
+
+def test_merge_upserts_on_primary_keys():
+    sql = _render("merge")
+    assert sql.startswith("MERGE INTO STAGING.S.T AS tgt")
+    assert "ON tgt.ID = src.ID" in sql
+    assert "WHEN MATCHED THEN UPDATE SET tgt.EVENT_DATE = src.EVENT_DATE" in sql
+
+
+def test_insert_only_anti_joins_existing_keys():
+    sql = _render("insert_only")
+    assert sql.startswith("INSERT INTO STAGING.S.T ( ID, EVENT_DATE, __INGESTED_TIMESTAMP, USER_ID )")
+    assert "WHERE NOT EXISTS ( SELECT 1 FROM STAGING.S.T AS tgt WHERE tgt.ID = src.ID )" in sql
+    assert "UPDATE" not in sql
+
+
+def test_delete_insert_scopes_partitions_to_rows_past_the_target_watermark():
+    sql = _render("delete_insert")
+    assert (
+        "CREATE OR REPLACE TEMPORARY TABLE STAGING.S.T__MERGE_PARTS AS "
+        "SELECT DISTINCT HASH(EVENT_DATE) AS PARTITION_KEY FROM RAW.S.T "
+        "WHERE __INGESTED_TIMESTAMP > ( SELECT COALESCE(MAX(__INGESTED_TIMESTAMP), TO_TIMESTAMP_LTZ(0)) FROM STAGING.S.T );"
+    ) in sql
+    assert "CREATE OR REPLACE TEMPORARY TABLE STAGING.S.T__MERGE_SRC AS " + DEDUP_SELECT + PARTITION_FILTER + DEDUP_QUALIFY in sql
+    assert (
+        "DELETE FROM STAGING.S.T AS tgt USING STAGING.S.T__MERGE_PARTS AS parts "
+        "WHERE HASH( tgt.EVENT_DATE ) = parts.PARTITION_KEY;"
+    ) in sql
+    assert sql.index("BEGIN TRANSACTION") < sql.index("DELETE FROM") < sql.index("INSERT INTO") < sql.index("COMMIT")
+    assert "WHEN OTHER THEN ROLLBACK;" in sql
+
+
+def test_delete_insert_requires_explicit_partition_columns():
+    config = {
+        "global": {
+            "utils_database": "UTILS",
+            "utils_schema": "UTILS",
+            "file_format": "CSV",
+            "databases": {"raw": "RAW", "staging": "STAGING"},
+        }
+    }
+    pipeline_cfg = {"namespace": "T", "schema": "S", "staging": {"merge_strategy": "delete_insert", "primary_keys": ["ID"]}}
+    client = SimpleNamespace(operation=lambda *_: nullcontext())
+    with pytest.raises(ValueError, match="partition_columns"):
+        _StagingOps(client, config, pipeline_cfg).merge()
@@ -0,0 +1,32 @@
+from src.utils.snowflake.operations import _QualityOps
+
+
+CONFIG = {
+    "global": {
+        "utils_database": "UTILS",
+        "utils_schema": "UTILS",
+        "file_format": "CSV",
+        "databases": {"raw": "RAW", "staging": "STAGING"},
+    }
+}
+
+
+def _quality(scope: str) -> _QualityOps:
+    pipeline_cfg = {
+        "namespace": "T",
+        "schema": "S",
+        "quality": {"enabled": True, "scope": scope, "checks": {"min_row_count": 1, "min_rows_per_file": 1}},
+    }
+    return _QualityOps(None, CONFIG, pipeline_cfg)
+
+
+def test_changed_scope_without_new_rows_is_not_a_violation():
+    assert _quality("changed").evaluate({"row_count": 0}, since="2025-01-01 00:00:00.000") == []
+
+
+def test_first_changed_profile_still_enforces_min_row_count():
+    assert _quality("changed").evaluate({"row_count": 0}) == ["row_count=0 < 1"]
+
+
+def test_full_scope_enforces_min_row_count():
+    assert _quality("full").evaluate({"row_count": 0}, since=None) == ["row_count=0 < 1"]
@@ -0,0 +1,79 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from src.utils import streaming
+from src.utils.streaming import StreamingIngest
+
+
+class _StubMinio:
+    def download(self, obj, local_path):
+        with open(local_path, "w") as f:
+            f.write(obj)
+
+
+class _StubPipeline:
+    copied = []
+    lock = threading.Lock()
+
+    def __init__(self, config, pipeline_cfg, batch_id=None, run_id=None):
+        self.env = SimpleNamespace(ensure_stage=lambda: None, stage_file=lambda path: f"stage/{path.rsplit('/', 1)[-1]}")
+        self.pipe = SimpleNamespace(copy_files=self._copy_files, wait=lambda: None, refresh=lambda: None)
+
+    def _copy_files(self, files):
+        with self.lock:
+            self.copied.extend(files)
+
+    def build_raw(self):
+        pass
+
+    def create_pipe(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize("queue_size", [1, 3, 8])
+def test_stream_completes_with_small_queues(monkeypatch, queue_size):
+    monkeypatch.setattr(streaming, "SnowflakePipeline", _StubPipeline)
+    _StubPipeline.copied = []
+
+    pipeline_cfg = {
+        "namespace": "EVENTS",
+        "bucket_path": "events",
+        "streaming": {"queue_size": queue_size, "upload_workers": 4, "load_workers": 2, "batch_size": 2},
+    }
+    objects = [f"events/file_{i}.csv" for i in range(12)]
+    ingest = StreamingIngest({}, pipeline_cfg)
+
+    result = {}
+    runner = threading.Thread(target=lambda: result.update(loaded=ingest.run_objects(objects, _StubMinio())), daemon=True)
+    runner.start()
+    runner.join(timeout=30)
+
+    assert not runner.is_alive(), "streaming run did not finish"
+    assert sorted(result["loaded"]) == sorted(f"stage/file_{i}.csv" for i in range(12))
+    assert sorted(_StubPipeline.copied) == sorted(result["loaded"])
+
+
+def test_same_file_name_in_different_subfolders_does_not_collide(monkeypatch):
+    monkeypatch.setattr(streaming, "SnowflakePipeline", _StubPipeline)
+    _StubPipeline.copied = []
+
+    pipeline_cfg = {
+        "namespace": "EVENTS",
+        "bucket_path": "events/",
+        "streaming": {"download_workers": 4, "upload_workers": 4, "batch_size": 2},
+    }
+    objects = [f"events/day_{i}/part.csv" for i in range(6)] + ["events/part.csv"]
+    loaded = StreamingIngest({}, pipeline_cfg).run_objects(objects, _StubMinio())
+
+    assert sorted(loaded) == sorted([f"stage/day_{i}__part.csv" for i in range(6)] + ["stage/part.csv"])
+
+
+def test_objects_mapping_to_the_same_local_name_are_rejected():
+    ingest = StreamingIngest({}, {"namespace": "EVENTS", "bucket_path": "events"})
+    with pytest.raises(ValueError, match="both map to"):
+        ingest.run_objects(["events/a/b.csv", "events/a__b.csv"], _StubMinio())